@@ -0,0 +1,43 @@
+from http import HTTPStatus
+
+from api.v1.__base__ import base_url
+from flask import Response
+from flask_restx import Namespace, Resource, fields, reqparse
+from schemas.v1 import schemas
+from services.availability import get_availability_service
+
+availability = Namespace('Availability', path=f'{base_url}/', description='')
+
+Availability = availability.model(
+    'Availability',
+    {
+        'login': fields.Boolean,
+        'email': fields.Boolean,
+    },
+)
+
+availability_parser = reqparse.RequestParser()
+availability_parser.add_argument('login', type=str, location='args', required=False)
+availability_parser.add_argument('email', type=str, location='args', required=False)
+
+
+@availability.route('/availability')
+class UserAvailability(Resource):
+
+    @availability.response(code=int(HTTPStatus.OK), description=' ', model=Availability)
+    @availability.expect(availability_parser)
+    def get(self):
+        args = availability_parser.parse_args()
+        availability_service = get_availability_service()
+
+        answer = schemas.Availability()
+        if args['login']:
+            answer.login = availability_service.is_login_available(login=args['login'])
+        if args['email']:
+            answer.email = availability_service.is_email_available(email=args['email'])
+
+        return Response(
+            response=answer.json(exclude_none=True),
+            status=HTTPStatus.OK,
+            content_type='application/json',
+        )
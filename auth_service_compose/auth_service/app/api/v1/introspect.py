@@ -0,0 +1,97 @@
+from enum import Enum
+from http import HTTPStatus
+
+from api.v1.__base__ import base_url
+from core.settings import settings
+from extensions.jwt import jwt_parser
+from flask import Response
+from flask_jwt_extended import decode_token, jwt_required
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_restx import Namespace, Resource, fields, reqparse
+from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
+from schemas.v1 import responses, schemas
+from services.jwt import get_jwt_service
+from utils.utils import make_error_response, required_role_level
+
+introspect = Namespace('Introspect', path=f'{base_url}/', description='')
+
+_IntrospectedToken = introspect.model(
+    'IntrospectedToken',
+    {
+        'active': fields.Boolean,
+        'status': fields.String,
+        'claims': fields.Raw,
+    },
+)
+
+Introspection = introspect.model(
+    'Introspection',
+    {
+        'items': fields.Nested(_IntrospectedToken, as_list=True),
+    },
+)
+
+introspect_parser = reqparse.RequestParser()
+introspect_parser.add_argument('tokens', type=list, location='json', required=True)
+
+
+class TokenStatus(str, Enum):
+    active = 'active'
+    revoked = 'revoked'
+    expired = 'expired'
+    invalid = 'invalid'
+
+
+@introspect.route('/introspect')
+@introspect.expect(jwt_parser)
+class Introspect(Resource):
+
+    @jwt_required()
+    @required_role_level(settings.INTROSPECT_ROLE_LEVEL)
+    @introspect.response(code=int(HTTPStatus.OK), description=' ', model=Introspection)
+    @introspect.response(code=int(HTTPStatus.BAD_REQUEST), description=' ')
+    @introspect.response(code=int(HTTPStatus.UNAUTHORIZED), description=' ')
+    @introspect.response(code=int(HTTPStatus.FORBIDDEN), description=' ')
+    @introspect.expect(introspect_parser)
+    def post(self):  # noqa: WPS210
+        tokens = introspect_parser.parse_args()['tokens']
+        if len(tokens) > settings.INTROSPECT_MAX_TOKENS:
+            return make_error_response(
+                msg=responses.TOO_MANY_TOKENS,
+                status=HTTPStatus.BAD_REQUEST,
+            )
+
+        jwt_service = get_jwt_service()
+
+        # Сначала проверяем подписи, затем отзыв всех валидных токенов разом
+        statuses, payloads = [], []
+        for token in tokens:
+            try:
+                payloads.append(decode_token(token))
+                statuses.append(TokenStatus.active)
+            except ExpiredSignatureError:
+                payloads.append(None)
+                statuses.append(TokenStatus.expired)
+            except (InvalidTokenError, JWTExtendedException):
+                payloads.append(None)
+                statuses.append(TokenStatus.invalid)
+
+        valid_payloads = [jwt_payload for jwt_payload in payloads if jwt_payload]
+        revoked = iter(jwt_service.get_revoked_tokens(jwt_payloads=valid_payloads))
+
+        items = []  # noqa: WPS110
+        for status, jwt_payload in zip(statuses, payloads):
+            if jwt_payload and next(revoked):
+                status = TokenStatus.revoked
+            is_active = status == TokenStatus.active
+            items.append(schemas.IntrospectedToken(
+                active=is_active,
+                status=status.value,
+                claims=jwt_payload if is_active else None,
+            ))
+
+        return Response(
+            response=schemas.Introspection(items=items).json(),
+            status=HTTPStatus.OK,
+            content_type='application/json',
+        )
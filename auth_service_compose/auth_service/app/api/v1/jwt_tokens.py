@@ -1,13 +1,15 @@
 from http import HTTPStatus
 
 from api.v1.__base__ import base_url
+from core.settings import settings
 from extensions.jwt import jwt_parser
-from flask import Response, current_app
-from flask_jwt_extended import current_user, get_jti, get_jwt, jwt_required
+from flask import Response
+from flask_jwt_extended import current_user, decode_token, get_jwt, jwt_required
 from flask_restx import Namespace, Resource, fields, reqparse
 from models.models import ActionsEnum
 from schemas.v1 import responses, schemas
 from services.jwt import get_jwt_service
+from services.login_guard import get_client_ip, get_login_guard_service
 from services.refresh_token import get_refresh_token_service
 from services.user import get_user_service
 from utils.utils import log_activity, make_error_response, save_activity
@@ -45,21 +47,38 @@ class JWTLogin(Resource):
 
     @jwt_tokens.response(code=int(HTTPStatus.OK), description=' ', model=JWT)
     @jwt_tokens.response(code=int(HTTPStatus.BAD_REQUEST), description=' ')
+    @jwt_tokens.response(code=int(HTTPStatus.TOO_MANY_REQUESTS), description=' ')
     @jwt_tokens.expect(login_parser)
-    def post(self):  # noqa: WPS210
+    def post(self):  # noqa: WPS210, WPS231
         args = login_parser.parse_args()
 
         jwt_service = get_jwt_service()
         user_service = get_user_service()
-
-        user = user_service.filter_by(login=args['login'], _first=True)
-
-        if not (user and user.check_password(args['password'])):
+        login_guard_service = get_login_guard_service()
+        ip = get_client_ip()
+
+        if settings.ENABLE_LOGIN_GUARD:
+            retry_after = login_guard_service.get_retry_after(login=args['login'], ip=ip)
+            if retry_after:
+                response = make_error_response(
+                    msg=responses.TOO_MANY_LOGIN_ATTEMPTS,
+                    status=HTTPStatus.TOO_MANY_REQUESTS,
+                )
+                response.headers['Retry-After'] = str(retry_after)
+                return response
+
+        user = user_service.get_by_login(login=args['login'])
+
+        if not (user and user_service.check_password(user=user, password=args['password'])):
+            if settings.ENABLE_LOGIN_GUARD:
+                login_guard_service.register_failure(login=args['login'], ip=ip)
             return make_error_response(
                 msg=responses.PROBLEMS_WITH_USER,
                 status=HTTPStatus.BAD_REQUEST,
             )
-        elif not user.email_is_confirmed:
+        if settings.ENABLE_LOGIN_GUARD:
+            login_guard_service.reset(login=args['login'])
+        if not user.email_is_confirmed:
             return make_error_response(
                 msg=responses.EMAIL_IS_NOT_CONFIRMED,
                 status=HTTPStatus.BAD_REQUEST,
@@ -91,20 +110,14 @@ class JWTLogout(Resource):
         jwt_service = get_jwt_service()
         refresh_token_service = get_refresh_token_service()
 
-        token_jti = get_jwt()['jti']
-        refresh_token_jti = get_jti(args['refresh_token'])
-
-        jwt_service.block_token(
-            cache_key=token_jti,
-            expire=current_app.config['JWT_ACCESS_TOKEN_EXPIRES'],
-        )
+        access_payload = get_jwt()
+        refresh_payload = decode_token(args['refresh_token'])
 
-        token_id = refresh_token_service.filter(token=args['refresh_token'], _first=True).id
-        refresh_token_service.delete(item_id=token_id)
-        jwt_service.block_token(
-            cache_key=refresh_token_jti,
-            expire=current_app.config['JWT_REFRESH_TOKEN_EXPIRES'],
-        )
+        refresh_token_service.delete_refresh_token(jti=refresh_payload['jti'])
+        jwt_service.block_tokens(tokens={
+            access_payload['jti']: access_payload['exp'],
+            refresh_payload['jti']: refresh_payload['exp'],
+        })
 
         return Response(status=HTTPStatus.NO_CONTENT)
 
@@ -118,7 +131,10 @@ class JWTRefresh(Resource):
     def post(self):
         jwt_service = get_jwt_service()
 
-        token = jwt_service.create_access_token(user=current_user)
+        if settings.JWT_REFRESH_FROM_CLAIMS:
+            token = jwt_service.create_access_token_from_claims(jwt_payload=get_jwt())
+        else:
+            token = jwt_service.create_access_token(user=current_user)
 
         return Response(
             response=schemas.JWTRefresh(access_token=token).json(),
@@ -137,7 +153,7 @@ class JWTLogoutEverywhere(Resource):
     @jwt_tokens.response(code=int(HTTPStatus.BAD_REQUEST), description=' ')
     @jwt_tokens.expect(logout_everywhere)
     def post(self):  # noqa: WPS210
-        args = logout_parser.parse_args()
+        args = logout_everywhere.parse_args()
 
         jwt_service = get_jwt_service()
         user_service = get_user_service()
@@ -146,22 +162,17 @@ class JWTLogoutEverywhere(Resource):
         user_id = get_jwt()['sub']
         user_db = user_service.get(item_id=user_id)
         # Передаваемый пароль не совпал с паролем в базе данных
-        if not user_db.check_password(args.pop('password')):
+        if not user_service.check_password(user=user_db, password=args.pop('password')):
             return Response(status=HTTPStatus.BAD_REQUEST)
 
-        token_jti = get_jwt()['jti']
+        if settings.ENABLE_REVOCATION_EPOCH:
+            # Одна запись в Redis отзывает все токены пользователя, выпущенные
+            # до этой секунды; текущий мог быть выпущен в ту же секунду
+            jwt_service.revoke_user_tokens(user_id=user_id)
+            jwt_service.block_tokens(tokens={get_jwt()['jti']: get_jwt()['exp']})
+            refresh_token_service.delete_refresh_tokens(user_id=user_id)
+            return Response(status=HTTPStatus.NO_CONTENT)
 
-        jwt_service.block_token(
-            cache_key=token_jti,
-            expire=current_app.config['JWT_ACCESS_TOKEN_EXPIRES'],
-        )
-
-        for token in refresh_token_service.get_refresh_tokens(user_id=user_id):
-            jti = get_jti(token)
-            refresh_token_service.delete(item_id=token.id)
-            jwt_service.block_token(
-                cache_key=jti,
-                expire=current_app.config['JWT_REFRESH_TOKEN_EXPIRES'],
-            )
+        jwt_service.block_user_tokens(user_id=user_id, access_payload=get_jwt())
 
         return Response(status=HTTPStatus.NO_CONTENT)
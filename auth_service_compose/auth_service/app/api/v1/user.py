@@ -13,6 +13,7 @@ from extensions.pagination import PaginatedResponse, pagination_parser
 from schemas.v1 import responses, schemas
 from services.user import get_user_service
 from services.user_roles import get_user_roles_service
+from utils.exceptions import UserAlreadyExistsError
 from utils.utils import log_activity, make_error_response, required_role_level
 
 user = Namespace('User', path=f'{base_url}/users', description='')
@@ -102,7 +103,7 @@ class Users(Resource):
         user_service = get_user_service()
         try:
             db_user = user_service.create_user(user_params=user_post_parser.parse_args())
-        except IntegrityError as e:
+        except (IntegrityError, UserAlreadyExistsError) as e:
             raise BadRequest(responses.USER_ALREADY_EXIST) from e
 
         return Response(
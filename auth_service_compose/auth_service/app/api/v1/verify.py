@@ -0,0 +1,54 @@
+import time
+from http import HTTPStatus
+
+from api.v1.__base__ import base_url
+from core.settings import settings
+from extensions.jwt import get_encoded_token
+from flask import Response
+from flask_restx import Namespace, Resource
+from schemas.v1 import responses
+from services.jwt import get_jwt_service
+from utils.utils import make_error_response
+
+verify = Namespace('Verify', path=f'{base_url}/', description='')
+
+
+def set_cache_headers(response: Response, max_age: int) -> Response:
+    # nginx кеширует ответ по X-Accel-Expires, клиентам кешировать его нельзя
+    response.headers['X-Accel-Expires'] = str(max_age)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
+
+
+@verify.route('/verify')
+class Verify(Resource):
+    """
+    Проверка токена для nginx auth_request: только статус и заголовки
+    с пользователем, без журнала активности, запроса к Postgres и лимитов.
+    Отзыв токена nginx увидит не позже чем через VERIFY_CACHE_SECONDS.
+    """
+
+    rate_limit_exempt = True
+
+    @verify.response(code=int(HTTPStatus.OK), description=' ')
+    @verify.response(code=int(HTTPStatus.UNAUTHORIZED), description=' ')
+    def get(self):
+        encoded_token = get_encoded_token()
+        jwt_payload = None
+        if encoded_token:
+            jwt_payload = get_jwt_service().verify_access_token(encoded_token=encoded_token)
+
+        if not jwt_payload:
+            response = make_error_response(
+                msg=responses.TOKEN_IS_NOT_VALID,
+                status=HTTPStatus.UNAUTHORIZED,
+            )
+            return set_cache_headers(response=response, max_age=0)
+
+        # Токен не должен пережить в кеше nginx свой срок действия
+        max_age = min(settings.VERIFY_CACHE_SECONDS, int(jwt_payload['exp'] - time.time()))
+
+        response = Response(status=HTTPStatus.OK)
+        response.headers['X-User-Id'] = jwt_payload['sub']
+        response.headers['X-User-Role'] = str(jwt_payload.get('role', 0))
+        return set_cache_headers(response=response, max_age=max(max_age, 0))
@@ -3,11 +3,16 @@ from http import HTTPStatus
 from traceback import format_exception
 
 import redis  # type: ignore
+from commands.benchmark import benchmark
+from commands.blocklist import blocklist
+from commands.refresh_tokens import refresh_tokens
 from core.settings import settings
 from db import cache_db, db
-from extensions import (flask_migrate, flask_restx, jwt, logstash, oauth,
-                        sentry, tracer)
-from extensions.rate_limiter import rate_limit
+from extensions import (flask_migrate, flask_restx, jwks, jwt, logstash,
+                        oauth, sentry, tracer)
+from extensions.pre_dispatch import pre_dispatch
+from extensions.rate_limiter import (get_rate_limit_policies,
+                                     set_rate_limit_headers)
 from flask import Flask, render_template, request
 from flask_jwt_extended import JWTManager, current_user, jwt_required
 from flask_restx import Api
@@ -15,8 +20,11 @@ from logstash.handler_udp import LogstashHandler
 from opentelemetry.instrumentation.flask import FlaskInstrumentor
 from schemas.base.responses import REQUEST_ID_REQUIRED
 from schemas.v1 import responses
+from services.availability import get_availability_service
 from services.base_cache import BaseRedisStorage
 from services.base_main import BaseSQLAlchemyStorage
+from services.logs_service import get_logs_service
+from services.revocation_filter import get_revocation_filter
 from sqlalchemy import exc
 from utils.utils import (log_activity, make_error_response,
                          register_blueprints, register_namespaces)
@@ -48,6 +56,31 @@ def init_cache_db():
     )
 
 
+def init_rate_limiter(app: Flask):
+    if not settings.ENABLE_LIMITER:
+        return
+    # Таблица политик собирается при старте, опечатка в правиле URL не даст запуститься
+    get_rate_limit_policies().check_rules(url_map=app.url_map)
+
+
+def init_revocation_filter():
+    if not settings.ENABLE_REVOCATION_FILTER:
+        return
+    get_revocation_filter().start()
+
+
+def init_availability_filter(app: Flask):
+    if not settings.ENABLE_AVAILABILITY_FILTER:
+        return
+    get_availability_service().start(app=app)
+
+
+def init_log_writer(app: Flask):
+    if not settings.ENABLE_LOG_WRITER:
+        return
+    get_logs_service().start(app=app)
+
+
 def init_oauth(app: Flask):
     oauth.init_oauth(app)
 
@@ -57,6 +90,12 @@ def init_db():
 
 
 def init_jwt(app: Flask):
+    if jwks.is_asymmetric(settings.JWT_ALGORITHM):
+        jwks.key_ring = jwks.KeyRing.from_directory(
+            path=settings.JWT_KEYS_DIR,
+            algorithm=settings.JWT_ALGORITHM,
+            active_kid=settings.JWT_ACTIVE_KID,
+        )
     jwt.jwt_manager = JWTManager(app)
     jwt.set_jwt_callbacks()
 
@@ -80,6 +119,12 @@ def init_migration(app: Flask, sqlalchemy):
     flask_migrate.migrate.init_app(app, sqlalchemy)
 
 
+def init_commands(app: Flask):
+    app.cli.add_command(benchmark)
+    app.cli.add_command(blocklist)
+    app.cli.add_command(refresh_tokens)
+
+
 def init_app(name: str) -> Flask:  # noqa: WPS213
     sentry.init_sentry()
     app = Flask(name)
@@ -89,6 +134,7 @@ def init_app(name: str) -> Flask:  # noqa: WPS213
     app.config['SECRET_KEY'] = settings.JWT_PUBLIC_KEY
     app.config['PUBLIC_KEY'] = settings.JWT_PUBLIC_KEY
     app.config['PROPAGATE_EXCEPTIONS'] = True
+    app.config['JWT_ALGORITHM'] = settings.JWT_ALGORITHM
     app.config['JWT_TOKEN_LOCATION'] = ['headers', 'cookies', 'json', 'query_string']
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = settings.JWT_ACCESS_TOKEN_EXPIRES
     app.config['JWT_REFRESH_TOKEN_EXPIRES'] = settings.JWT_REFRESH_TOKEN_EXPIRES
@@ -103,9 +149,16 @@ def init_app(name: str) -> Flask:  # noqa: WPS213
     db.notify_pipeline = db.init_pipeline()
 
     init_cache_db()
+    init_rate_limiter(app=app)
+    init_revocation_filter()
+    init_availability_filter(app=app)
+
+    init_log_writer(app=app)
 
     init_migration(app=app, sqlalchemy=db.sqlalchemy)
 
+    init_commands(app=app)
+
     init_tracer(app=app)
 
     init_logger(app=app)
@@ -119,16 +172,27 @@ def init_app(name: str) -> Flask:  # noqa: WPS213
 app = init_app('flask_auth')
 
 
+def is_rate_limit_exempt() -> bool:
+    view = app.view_functions.get(request.endpoint)
+    view = getattr(view, 'view_class', view)
+    return getattr(view, 'rate_limit_exempt', False)
+
+
 @app.before_request
 def before_request_callback():
     request_id = request.headers.get('X-Request-Id')
     if not request_id:
         return make_error_response(msg=REQUEST_ID_REQUIRED, status=HTTPStatus.BAD_REQUEST)
 
-    is_too_many_requests = rate_limit()
+    if is_rate_limit_exempt():
+        return None
+
+    return pre_dispatch()
+
 
-    if is_too_many_requests:
-        return is_too_many_requests
+@app.after_request
+def after_request_callback(response):
+    return set_rate_limit_headers(response=response)
 
 
 @app.errorhandler(exc.SQLAlchemyError)
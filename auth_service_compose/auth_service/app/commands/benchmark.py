@@ -0,0 +1,144 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import click
+from core.settings import settings
+from db.cache_db import get_cache_db
+from extensions.rate_limiter import (FIXED_WINDOW, GCRA, HYBRID,
+                                     GCRARateLimiter, create_rate_limiter)
+from flask import current_app
+from flask.cli import AppGroup
+from flask_jwt_extended import create_refresh_token
+from services.claims import get_claims_service
+from services.jwt import TokenIdentity
+from services.user import get_user_service
+from utils.password_hasher import PasswordScheme, create_scheme
+
+benchmark = AppGroup('benchmark', help='Замеры производительности горячих путей сервиса.')
+
+
+def measure(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+
+@benchmark.command('refresh')
+@click.option('--user-id', required=True, help='Существующий пользователь.')
+@click.option('--iterations', default=1000, show_default=True)
+def refresh_benchmark(user_id: str, iterations: int):
+    """Пропускная способность POST /refresh до и после перехода на клеймы из кеша."""
+    client = current_app.test_client()
+    refresh_token = create_refresh_token(identity=TokenIdentity(id=user_id))
+    user_service = get_user_service()
+    claims_service = get_claims_service()
+
+    def refresh():
+        response = client.post(
+            f'/{settings.API_URL.strip("/")}/v1/refresh',
+            headers={
+                'Authorization': f'Bearer {refresh_token}',
+                'X-Request-Id': str(uuid.uuid4()),
+            },
+        )
+        assert response.status_code == HTTPStatus.OK, response.data  # noqa: S101
+
+    def refresh_before():
+        # Прежнее поведение: пользователь и его роли каждый раз читаются из Postgres.
+        # Удаляем только записи кеша, версии клеймов в Redis не трогаем
+        user_service.local_cache.delete(user_id)
+        user_service.delete_item_from_cache(cache_key=f'{user_service.user_key_prefix}:{user_id}')
+        claims_service.delete_item_from_cache(
+            cache_key=claims_service.get_claims_cache_key(user_id=user_id),
+        )
+        refresh()
+
+    enable_limiter, refresh_from_claims = settings.ENABLE_LIMITER, settings.JWT_REFRESH_FROM_CLAIMS
+    try:
+        settings.ENABLE_LIMITER = False
+        settings.JWT_REFRESH_FROM_CLAIMS = False
+        before = measure(refresh_before, iterations)
+
+        settings.JWT_REFRESH_FROM_CLAIMS = True
+        refresh()
+        after = measure(refresh, iterations)
+    finally:
+        settings.ENABLE_LIMITER = enable_limiter
+        settings.JWT_REFRESH_FROM_CLAIMS = refresh_from_claims
+
+    click.echo(f'before: {before:.1f} refresh/s')
+    click.echo(f'after:  {after:.1f} refresh/s ({after / before:.2f}x)')
+
+
+def measure_hashes(scheme: PasswordScheme, workers: int, seconds: float) -> float:
+    # Хешируем сразу в workers потоках, как PasswordHasher в воркере сервиса
+    hashes = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while time.perf_counter() - started < seconds:
+            list(executor.map(scheme.hash, ['password'] * workers))
+            hashes += workers
+    return hashes / (time.perf_counter() - started)
+
+
+@benchmark.command('password')
+@click.option('--scheme', 'scheme_name', default=settings.PASSWORD_HASH_SCHEME, show_default=True)
+@click.option('--target', required=True, type=float, help='Нужное число хешей в секунду.')
+@click.option('--workers', default=settings.PASSWORD_HASHER_WORKERS, show_default=True)
+@click.option('--seconds', default=2.0, show_default=True)
+def password_benchmark(scheme_name: str, target: float, workers: int, seconds: float):
+    """Подбирает максимальную стоимость хеша, при которой выдерживается target хешей/с."""
+    scheme = create_scheme(scheme_name)
+    # Начинаем с дешёвого варианта и удваиваем стоимость, пока укладываемся в бюджет
+    cost = max(scheme.cost // 2 ** 6, 1)
+    best = None
+    while True:  # noqa: WPS457
+        rate = measure_hashes(scheme.with_cost(cost), workers, seconds)
+        click.echo(f'{scheme.cost_name}={cost}: {rate:.1f} hashes/s')
+        if rate < target:
+            break
+        best = cost
+        cost *= 2
+
+    if best is None:
+        click.echo(f'{target} hashes/s is unreachable with {workers} workers')
+        return
+    click.echo(f'recommended: PASSWORD_HASH_SCHEME={scheme.name} {scheme.cost_name}={best}')
+
+
+@benchmark.command('rate-limit')
+@click.option('--requests', 'requests_count', default=10_000, show_default=True)
+@click.option('--keys', 'keys_count', default=100, show_default=True)
+def rate_limit_benchmark(requests_count: int, keys_count: int):
+    """Команды Redis и задержка на запрос у прежнего счётчика, GCRA и гибридного лимитера."""
+    cache = get_cache_db()
+    keys = [f'rate-limit-benchmark:{uuid.uuid4()}' for _ in range(keys_count)]
+
+    for name in (FIXED_WINDOW, GCRA, HYBRID):
+        limiter = create_rate_limiter(
+            name=name,
+            cache=cache,
+            limit=settings.REQUEST_LIMIT_PER_MINUTE,
+        )
+        # Скрипт загружается в Redis первым вызовом, его в замер не включаем
+        limiter.hit(key=keys[0])
+        commands_before = cache.commands_processed()
+        started = time.perf_counter()
+        for index in range(requests_count):
+            limiter.hit(key=keys[index % keys_count])
+        elapsed = time.perf_counter() - started
+        # INFO, которым читается счётчик, сам тоже считается командой
+        commands = cache.commands_processed() - commands_before - 1
+        click.echo(
+            f'{name}: {commands / requests_count:.2f} commands/request, '
+            f'{elapsed / requests_count * 1000:.3f} ms/request',
+        )
+
+    pipeline = cache.pipeline()
+    for key in keys:
+        pipeline.delete(key=key)
+        pipeline.delete(key=f'{GCRARateLimiter.key_prefix}:{key}')
+    pipeline.execute()
@@ -0,0 +1,110 @@
+import json
+import time
+import uuid
+
+import click
+from core.settings import settings
+from db.cache_db import get_cache_db
+from flask.cli import AppGroup
+from services.base_cache import CacheStorage
+from services.jwt import JWTService, get_jwt_service
+from services.revocation_filter import (LEGACY_KEY_PATTERN,
+                                        LEGACY_VALUE_PREFIX,
+                                        get_revocation_filter)
+from utils.iteration import batched
+
+blocklist = AppGroup('blocklist', help='Обслуживание списка отозванных токенов в Redis.')
+
+REPORT_KEY_PREFIX = 'blocklist-report'
+TOKENS_IN_REPORT = 1_000_000
+
+
+def read_legacy_tokens(cache: CacheStorage, keys: list[bytes]) -> dict[str, int]:
+    pipeline = cache.pipeline()
+    for key in keys:
+        pipeline.get(key=key)
+        pipeline.ttl(key=key)
+    cache_values = pipeline.execute()
+
+    now = int(time.time())
+    tokens = {}
+    for key, cache_value, ttl in zip(keys, cache_values[::2], cache_values[1::2]):
+        # Под тем же шаблоном лежат счётчики лимитов по id пользователя
+        if cache_value and cache_value.startswith(LEGACY_VALUE_PREFIX) and ttl > 0:
+            tokens[key.decode('utf-8')] = now + ttl
+    return tokens
+
+
+def move_to_blocklist(cache: CacheStorage, jwt_service: JWTService, tokens: dict[str, int]):
+    # Перенос публикуется в поток, как и обычный отзыв, чтобы фильтры воркеров
+    # узнали о токене до того, как исчезнет его ключ прежнего формата
+    pipeline = cache.pipeline()
+    jwt_service.put_to_blocklist(pipeline=pipeline, tokens=tokens)
+    get_revocation_filter().publish(jtis=list(tokens), pipeline=pipeline)
+    for jti in tokens:
+        pipeline.delete(key=jti)
+    pipeline.execute()
+
+
+@blocklist.command('migrate')
+@click.option('--batch-size', default=1000, show_default=True)
+def migrate(batch_size: int):
+    """Переносит ключи прежнего формата в множества по часу истечения."""
+    cache = get_cache_db()
+    jwt_service = get_jwt_service()
+    migrated = 0
+
+    for keys in batched(cache.scan(match=LEGACY_KEY_PATTERN, count=batch_size), batch_size):
+        tokens = read_legacy_tokens(cache=cache, keys=keys)
+        if tokens:
+            move_to_blocklist(cache=cache, jwt_service=jwt_service, tokens=tokens)
+            migrated += len(tokens)
+
+    click.echo(f'migrated: {migrated} tokens')
+
+
+@blocklist.command('memory')
+@click.option('--tokens', 'tokens_count', default=100_000, show_default=True)
+@click.option('--batch-size', default=1000, show_default=True)
+def memory_report(tokens_count: int, batch_size: int):
+    """Память Redis на миллион отозванных refresh токенов в прежнем и новом формате."""
+    cache = get_cache_db()
+    jwt_service = get_jwt_service()
+    lifetime = int(settings.JWT_REFRESH_TOKEN_EXPIRES.total_seconds())
+    now = int(time.time())
+    jtis = [str(uuid.uuid4()) for _ in range(tokens_count)]
+
+    def fill_legacy(pipeline, jtis_batch: list[str]):
+        for jti in jtis_batch:
+            pipeline.set(
+                key=f'{REPORT_KEY_PREFIX}:{jti}',
+                cache_value=json.dumps({'jti': jti}),
+                expire=lifetime,
+            )
+
+    def fill_compact(pipeline, jtis_batch: list[str]):
+        # Сроки истечения равномерно размазаны по времени жизни refresh токена
+        jwt_service.put_to_blocklist(
+            pipeline=pipeline,
+            tokens={jti: now + hash(jti) % lifetime for jti in jtis_batch},
+        )
+
+    jwt_service.blocklist_key_prefix = f'{REPORT_KEY_PREFIX}:bucket'
+    try:
+        for name, fill in (('legacy', fill_legacy), ('compact', fill_compact)):
+            used_before = cache.memory_used()
+            for jtis_batch in batched(jtis, batch_size):
+                pipeline = cache.pipeline()
+                fill(pipeline, jtis_batch)
+                pipeline.execute()
+            used = cache.memory_used() - used_before
+            per_million = used * TOKENS_IN_REPORT / tokens_count
+            click.echo(f'{name}: {per_million / 2 ** 20:.1f} MiB per million tokens')
+            report_keys = cache.scan(match=f'{REPORT_KEY_PREFIX}:*', count=batch_size)
+            for keys in batched(report_keys, batch_size):
+                pipeline = cache.pipeline()
+                for key in keys:
+                    pipeline.delete(key=key)
+                pipeline.execute()
+    finally:
+        jwt_service.blocklist_key_prefix = type(jwt_service).blocklist_key_prefix
@@ -0,0 +1,38 @@
+import time
+from datetime import datetime, timezone
+
+import click
+from flask.cli import AppGroup
+from services.refresh_token import get_refresh_token_service
+
+refresh_tokens = AppGroup('refresh-tokens', help='Обслуживание таблицы refresh токенов.')
+
+
+@refresh_tokens.command('purge')
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--pause', default=0.1, show_default=True, help='Пауза между пачками, с.')
+def purge(batch_size: int, pause: float):
+    """Удаляет истекшие refresh токены пачками по индексу на колонке to."""
+    refresh_token_service = get_refresh_token_service()
+    expired_before = datetime.now(timezone.utc)
+
+    deleted, batches = 0, 0
+    started = time.perf_counter()
+    while True:  # noqa: WPS457
+        batch_deleted = refresh_token_service.delete_expired_refresh_tokens(
+            expired_before=expired_before,
+            limit=batch_size,
+        )
+        deleted += batch_deleted
+        batches += 1
+
+        elapsed = time.perf_counter() - started
+        click.echo(
+            f'batch {batches}: deleted {deleted} tokens, '
+            f'{deleted / elapsed:.0f} rows/s',
+        )
+        if batch_deleted < batch_size:
+            break
+        time.sleep(pause)
+
+    click.echo(f'done: {deleted} tokens in {time.perf_counter() - started:.1f}s')
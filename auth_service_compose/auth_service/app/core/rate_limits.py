@@ -0,0 +1,47 @@
+from typing import NamedTuple, Optional
+
+from core.settings import settings
+
+ANY = '*'
+API_V1 = f'{settings.API_URL}/v1'
+STAFF = settings.RATE_LIMIT_STAFF_ROLE_LEVEL
+
+
+class RateLimitPolicy(NamedTuple):
+    """
+    Лимит запросов в минуту для правила URL Flask, метода и уровня роли из токена.
+    Политики с одним name делят общий счётчик, limit=None снимает ограничение.
+    """
+
+    name: str
+    limit: Optional[int]
+    rule: str = ANY
+    methods: tuple[str, ...] = (ANY,)
+    min_role: int = 0
+
+
+# Сначала ищется политика для правила и метода, затем для правила, затем общая.
+# Из подходящих берётся политика с наибольшим min_role, не превышающим роль клиента.
+RATE_LIMIT_POLICIES = (
+    RateLimitPolicy(name='default', limit=settings.REQUEST_LIMIT_PER_MINUTE),
+    RateLimitPolicy(name='staff', limit=settings.REQUEST_LIMIT_PER_MINUTE * 10, min_role=STAFF),
+
+    # Подбор паролей и регистрация ботами: считаем вход через API и форму вместе
+    RateLimitPolicy(name='login', limit=10, rule=f'{API_V1}/login', methods=('POST',)),
+    RateLimitPolicy(name='login', limit=10, rule='/login', methods=('POST',)),
+    RateLimitPolicy(name='register', limit=5, rule='/register', methods=('POST',)),
+    RateLimitPolicy(name='password', limit=5, rule=f'{API_V1}/users/<user_id>/password'),
+    RateLimitPolicy(
+        name='password',
+        limit=None,
+        rule=f'{API_V1}/users/<user_id>/password',
+        min_role=STAFF,
+    ),
+
+    # Обновление access токена дешёвое и происходит раз в несколько минут на сессию
+    RateLimitPolicy(
+        name='refresh',
+        limit=settings.REQUEST_LIMIT_PER_MINUTE * 3,
+        rule=f'{API_V1}/refresh',
+    ),
+)
@@ -29,6 +29,24 @@ class Settings(BaseSettings):
     JAEGER_PORT: int
 
     REQUEST_LIMIT_PER_MINUTE: int
+    # gcra - token bucket одним Lua-скриптом, fixed - прежний счётчик INCR+EXPIRE,
+    # hybrid - gcra, токены которого воркер берёт пачками и расходует локально
+    RATE_LIMITER = 'gcra'
+    RATE_LIMIT_LOCAL_CHUNK = 10
+    RATE_LIMIT_LOCAL_SYNC_SECONDS = 1.0
+    RATE_LIMIT_LOCAL_KEYS = 10_000
+    # Уровень роли, с которого действуют политики лимитов для сотрудников (core/rate_limits.py)
+    RATE_LIMIT_STAFF_ROLE_LEVEL = 10
+    # До обработчика вместе с лимитом и отзывом токена читать пользователя из Redis
+    PRE_DISPATCH_FETCH_USER = True
+
+    # Журнал активности пишется фоновым потоком пачками; при False - в каждом запросе
+    ENABLE_LOG_WRITER = True
+    LOG_WRITER_QUEUE_SIZE = 10_000
+    LOG_WRITER_BATCH_SIZE = 500
+    LOG_WRITER_FLUSH_SECONDS = 1.0
+    # Сколько запрос ждёт места в полной очереди, прежде чем записать сам
+    LOG_WRITER_PUT_TIMEOUT = 0.1
 
     API_URL: str
 
@@ -36,6 +54,61 @@ class Settings(BaseSettings):
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=DAYS_IN_MONTH)
     JWT_SECRET_KEY: str
     JWT_PUBLIC_KEY: str
+    JWT_REFRESH_FROM_CLAIMS = True
+    # HS256 подписывает общим секретом; RS256/ES256 - ключами из JWT_KEYS_DIR (<kid>.pem)
+    JWT_ALGORITHM = 'HS256'
+    JWT_KEYS_DIR = 'keys'
+    JWT_ACTIVE_KID = ''
+    JWKS_MAX_AGE = 300
+    INTROSPECT_MAX_TOKENS = 100
+    # Интроспекция отвечает, отозван ли чужой токен: доступна только шлюзу и сервисам
+    INTROSPECT_ROLE_LEVEL = 10
+    VERIFY_CACHE_SECONDS = 5
+
+    USER_CACHE_SIZE = 10_000
+    USER_CACHE_LOCAL_TTL = 5
+    USER_CACHE_EXPIRE = 600
+
+    CLAIMS_CACHE_EXPIRE = 3600
+
+    ENABLE_AVAILABILITY_FILTER = True
+    AVAILABILITY_FILTER_CAPACITY = 1_000_000
+    AVAILABILITY_FILTER_ERROR_RATE = 0.01
+
+    # thread - нативные потоки (под gevent - пул хаба), inline - в потоке запроса
+    PASSWORD_HASHER_EXECUTOR = 'thread'
+    PASSWORD_HASHER_WORKERS = 4
+
+    # Блокировка подбора пароля: после порога неудач окно удваивается до максимума
+    ENABLE_LOGIN_GUARD = True
+    LOGIN_FAILURES_THRESHOLD = 5
+    LOGIN_IP_FAILURES_THRESHOLD = 20
+    LOGIN_FAILURES_WINDOW = 900
+    LOGIN_LOCK_SECONDS = 30
+    LOGIN_LOCK_MAX_SECONDS = 3600
+    # Только этим прокси (имена хостов, адреса или сети) верим в X-Real-IP
+    TRUSTED_PROXIES: list[str] = ['nginx_auth']
+    # pbkdf2, scrypt или argon2id; хеши по старой политике обновляются при входе
+    PASSWORD_HASH_SCHEME = 'pbkdf2'
+    PASSWORD_PBKDF2_ITERATIONS = 260_000
+    PASSWORD_SCRYPT_N = 2 ** 15
+    PASSWORD_SCRYPT_R = 8
+    PASSWORD_SCRYPT_P = 1
+    PASSWORD_ARGON2_TIME_COST = 3
+    PASSWORD_ARGON2_MEMORY_COST = 65536
+    PASSWORD_ARGON2_PARALLELISM = 4
+
+    # Отозванные jti хранятся в множествах по часу истечения токена
+    BLOCKLIST_BUCKET_SECONDS = 3600
+    # Проверять и ключи прежнего формата, пока не выполнен flask blocklist migrate
+    BLOCKLIST_CHECK_LEGACY = False
+
+    ENABLE_REVOCATION_EPOCH = True
+    # Выключает только локальный фильтр воркеров: поток revoked_tokens пишется
+    # всегда, его читает RevocationCache в сервисах-клиентах (auth_client)
+    ENABLE_REVOCATION_FILTER = True
+    REVOCATION_FILTER_CAPACITY = 1_000_000
+    REVOCATION_FILTER_ERROR_RATE = 0.001
 
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
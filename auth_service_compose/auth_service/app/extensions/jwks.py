@@ -0,0 +1,78 @@
+import json
+import os
+from typing import Optional
+
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+from utils.exceptions import (CantGetInitializedObjectError,
+                              UnknownSigningKeyError)
+
+PRIVATE_KEY_EXTENSION = '.pem'
+
+JWK_ALGORITHMS = {
+    'RS': RSAAlgorithm,
+    'PS': RSAAlgorithm,
+    'ES': ECAlgorithm,
+    'Ed': OKPAlgorithm,
+}
+
+
+class KeyRing:
+    """
+    Набор ключей подписи, каждый под своим kid.
+    Подписываем активным ключом, проверяем любым из набора: при ротации
+    новый ключ сначала публикуется в JWKS, а старый удаляется, когда
+    истекут все подписанные им токены.
+    """
+
+    def __init__(self, algorithm: str, private_keys: dict, active_kid: str):
+        if active_kid not in private_keys:
+            raise KeyError(f'Signing key {active_kid} is not in the key ring')
+
+        self.algorithm = algorithm
+        self.private_keys = private_keys
+        self.public_keys = {kid: key.public_key() for kid, key in private_keys.items()}
+        self.active_kid = active_kid
+
+    @classmethod
+    def from_directory(cls, path: str, algorithm: str, active_kid: str) -> 'KeyRing':
+        private_keys = {}
+        for filename in sorted(os.listdir(path)):
+            kid, extension = os.path.splitext(filename)
+            if extension != PRIVATE_KEY_EXTENSION:
+                continue
+            with open(os.path.join(path, filename), 'rb') as key_file:
+                private_keys[kid] = load_pem_private_key(key_file.read(), password=None)
+        return cls(algorithm=algorithm, private_keys=private_keys, active_kid=active_kid)
+
+    def get_signing_key(self):
+        return self.private_keys[self.active_kid]
+
+    def get_verification_key(self, kid: Optional[str]):
+        # Токены без kid подписаны до ротации ключей
+        public_key = self.public_keys.get(kid or self.active_kid)
+        if public_key is None:
+            raise UnknownSigningKeyError(kid=kid)
+        return public_key
+
+    def get_jwks(self) -> dict:
+        jwk_algorithm = JWK_ALGORITHMS[self.algorithm[:2]]
+        keys = []
+        for kid, public_key in self.public_keys.items():
+            jwk = json.loads(jwk_algorithm.to_jwk(public_key))
+            jwk.update({'kid': kid, 'use': 'sig', 'alg': self.algorithm})
+            keys.append(jwk)
+        return {'keys': keys}
+
+
+key_ring: Optional[KeyRing] = None
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    return algorithm[:2] in JWK_ALGORITHMS
+
+
+def get_key_ring() -> KeyRing:
+    if not key_ring:
+        raise CantGetInitializedObjectError(object_name='jwt key ring')
+    return key_ring
@@ -2,14 +2,16 @@ from datetime import datetime, timezone
 from http import HTTPStatus
 from typing import Optional
 
-from flask import current_app, make_response, redirect, request
+from core.settings import settings
+from extensions import jwks
+from flask import current_app, g, make_response, redirect, request
 from flask_jwt_extended import (JWTManager, get_jti, set_access_cookies,
                                 unset_jwt_cookies)
 from flask_restx import reqparse
 from jwt.exceptions import InvalidTokenError
+from services.claims import get_claims_service
 from services.jwt import get_jwt_service
 from services.user import get_user_service
-from services.user_roles import get_user_roles_service
 from utils.utils import make_error_response, work_in_context
 
 jwt_manager: Optional[JWTManager] = None
@@ -17,14 +19,29 @@ jwt_manager: Optional[JWTManager] = None
 jwt_parser = reqparse.RequestParser()
 jwt_parser.add_argument('Authorization', location='headers')
 
+BEARER_PREFIX = 'Bearer '
+
+
+def get_encoded_token(refresh_cookie: bool = False) -> Optional[str]:
+    """Токен из заголовка Authorization или из cookie, без проверки и разбора."""
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith(BEARER_PREFIX):
+        return authorization[len(BEARER_PREFIX):]
+    encoded_token = request.cookies.get(current_app.config['JWT_ACCESS_COOKIE_NAME'])
+    if encoded_token or not refresh_cookie:
+        return encoded_token
+    return request.cookies.get(current_app.config['JWT_REFRESH_COOKIE_NAME'])
+
 
 def set_jwt_callbacks():  # noqa: WPS231, WPS210, WPS212
     @jwt_manager.token_in_blocklist_loader
     def check_if_token_is_revoked(jwt_header, jwt_payload: dict):
-        jti = jwt_payload['jti']
+        # Для токена из заголовка или cookie ответ уже получен в pre_dispatch
+        revoked = g.get('prefetched_revoked', {}).get(jwt_payload['jti'])
+        if revoked is not None:
+            return revoked
         jwt_service = get_jwt_service()
-        token_in_redis = jwt_service.get_blocked_token(cache_key=jti)
-        return token_in_redis is not None
+        return jwt_service.is_token_revoked(jwt_payload=jwt_payload)
 
     @jwt_manager.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
@@ -35,7 +52,6 @@ def set_jwt_callbacks():  # noqa: WPS231, WPS210, WPS212
             )
 
         jwt_service = get_jwt_service()
-        user_service = get_user_service()
 
         try:
             response = make_response(
@@ -54,11 +70,18 @@ def set_jwt_callbacks():  # noqa: WPS231, WPS210, WPS212
             )
 
             if target_timestamp > jwt_payload['exp']:
+                if settings.JWT_REFRESH_FROM_CLAIMS:
+                    access_token = jwt_service.create_access_token_from_claims(
+                        jwt_payload=jwt_payload,
+                    )
+                else:
+                    user_service = get_user_service()
+                    access_token = jwt_service.create_access_token(
+                        user=user_service.get_current_user(user_id=jwt_payload['sub']),
+                    )
                 set_access_cookies(
                     response=response,
-                    encoded_access_token=jwt_service.create_access_token(
-                        user=user_service.get(item_id=jwt_payload['sub']),
-                    ),
+                    encoded_access_token=access_token,
                 )
 
             return response
@@ -105,16 +128,30 @@ def set_jwt_callbacks():  # noqa: WPS231, WPS210, WPS212
     def user_lookup_callback(_jwt_header, jwt_data):
         identity = jwt_data['sub']
         user_service = get_user_service()
-        return user_service.get(item_id=identity)
+        return user_service.get_current_user(user_id=identity)
 
     @jwt_manager.additional_claims_loader
     @work_in_context(current_app)
     def add_claims_to_access_token(identity) -> dict:
-        user_roles_service = get_user_roles_service()
-        role = user_roles_service.get_highest_role(identity.id)
+        claims_service = get_claims_service()
+        return claims_service.get_claims(user_id=identity.id).dict()
+
+    if jwks.key_ring:
+        set_key_ring_callbacks(key_ring=jwks.key_ring)
+
+
+def set_key_ring_callbacks(key_ring: jwks.KeyRing):
+    @jwt_manager.encode_key_loader
+    def encode_key_callback(identity):
+        return key_ring.get_signing_key()
+
+    @jwt_manager.decode_key_loader
+    def decode_key_callback(jwt_header: dict, jwt_payload: dict):
+        return key_ring.get_verification_key(kid=jwt_header.get('kid'))
 
-        return {'role': role.level,
-                'permissions': identity.permissions}
+    @jwt_manager.additional_headers_loader
+    def add_kid_to_headers(identity) -> dict:
+        return {'kid': key_ring.active_kid}
 
 
 def get_jwt_manager() -> Optional[JWTManager]:
@@ -0,0 +1,53 @@
+from functools import partial
+from typing import Optional
+
+from core.settings import settings
+from db.cache_db import get_cache_db
+from extensions.jwt import get_encoded_token
+from extensions.rate_limiter import queue_rate_limit
+from flask import Response, g
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import InvalidTokenError
+from services.base_cache import PipelineBatch
+from services.jwt import get_jwt_service
+from services.user import get_user_service
+
+
+def decode_request_token() -> Optional[dict]:
+    """
+    Токен запроса с проверкой только подписи и срока, без user_lookup_loader
+    и списка отзыва: до обработчика в Postgres не ходим.
+    Неверный токен - запрос без токена, его отклонит сам обработчик.
+    """
+    encoded_token = get_encoded_token(refresh_cookie=True)
+    if not encoded_token:
+        return None
+    try:
+        return decode_token(encoded_token)
+    except (InvalidTokenError, JWTExtendedException):
+        return None
+
+
+def pre_dispatch() -> Optional[Response]:
+    """
+    Лимит запросов, отзыв токена и пользователь из кеша - одним пайплайном Redis.
+    Отзыв кладётся в g для token_in_blocklist_loader, пользователь - в память
+    воркера, откуда его возьмёт user_lookup_loader.
+    """
+    jwt_data = decode_request_token()
+
+    batch = PipelineBatch(pipeline=get_cache_db().pipeline())
+    batch.add(partial(queue_rate_limit, jwt_data=jwt_data))
+    if jwt_data:
+        batch.add(partial(get_jwt_service().queue_revocation_check, jwt_payloads=[jwt_data]))
+        if settings.PRE_DISPATCH_FETCH_USER:
+            batch.add(partial(get_user_service().queue_current_user, user_id=jwt_data['sub']))
+
+    too_many_requests, *checks = batch.execute()
+    if too_many_requests:
+        return too_many_requests
+
+    if jwt_data:
+        g.prefetched_revoked = {jwt_data['jti']: checks[0][0]}
+    return None
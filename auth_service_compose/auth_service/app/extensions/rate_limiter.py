@@ -1,32 +1,353 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from functools import lru_cache, partial
 from http import HTTPStatus
-from typing import Optional
+from typing import Callable, Iterable, NamedTuple, Optional
 
+from core.rate_limits import ANY, RATE_LIMIT_POLICIES, RateLimitPolicy
 from core.settings import settings
 from db.cache_db import get_cache_db
-from flask import Response, request
-from flask_jwt_extended import current_user
+from flask import Response, g, request
 from schemas.base.responses import TOO_MANY_REQUESTS
+from services.base_cache import CachePipeline, CacheStorage, PipelineBatch
+from services.login_guard import get_client_ip
+from utils.ttl_cache import TTLCache
 from utils.utils import make_error_response
+from werkzeug.routing import Map
 
 PIPE_EXPIRE_IN_SECONDS = 59
+LIMIT_PERIOD_IN_SECONDS = 60
+MS_IN_SECOND = 1000
 
+FIXED_WINDOW = 'fixed'
+GCRA = 'gcra'
+HYBRID = 'hybrid'
 
-def rate_limit() -> Optional[Response]:
-    if not settings.ENABLE_LIMITER:
+# GCRA: в ключе хранится теоретическое время прихода следующего запроса (TAT).
+# Выдаётся до ARGV[3] токенов из доступных, пока TAT не ушёл вперёд больше чем на весь лимит.
+# ARGV[4] неизрасходованных ранее токенов сначала возвращаются: TAT сдвигается назад,
+# но не раньше текущего момента, поэтому возврат не даёт больше лимита.
+# Время берётся у Redis, поэтому часы воркеров не влияют на результат.
+GCRA_SCRIPT = """
+local emission_interval = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local returned = tonumber(ARGV[4])
+local time = redis.call('TIME')
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+local burst_tolerance = emission_interval * limit
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if tat then
+    tat = tat - emission_interval * returned
+end
+if not tat or tat < now then
+    tat = now
+end
+local available = math.floor((now + burst_tolerance - tat) / emission_interval)
+if available < 1 then
+    return {0, 0, math.ceil(tat + emission_interval - burst_tolerance - now)}
+end
+
+local granted = math.min(requested, available)
+local new_tat = tat + emission_interval * granted
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {granted, available - granted, 0}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: int
+
+
+class RateLimiter(ABC):
+    def __init__(self, cache: CacheStorage, limit: int):
+        self.cache = cache
+        self.limit = limit
+
+    def hit(self, key: str) -> RateLimitResult:
+        batch = PipelineBatch(pipeline=self.cache.pipeline())
+        batch.add(partial(self.queue_hit, key=key))
+        return batch.execute()[0]
+
+    # Ставит команды в общий пайплайн, результат отдаёт разборщик после execute
+    @abstractmethod
+    def queue_hit(self, pipeline: CachePipeline, key: str) -> Callable[[list], RateLimitResult]:
+        pass  # noqa: WPS420
+
+
+class FixedWindowRateLimiter(RateLimiter):
+    """Прежний счётчик: INCR и EXPIRE одним пайплайном, окно продлевается каждым запросом."""
+
+    def queue_hit(self, pipeline: CachePipeline, key: str) -> Callable[[list], RateLimitResult]:
+        pipeline.incr(key, 1)
+        pipeline.expire(key, PIPE_EXPIRE_IN_SECONDS)
+        return lambda cache_values: self.get_result(request_number=cache_values[0])
+
+    def get_result(self, request_number: int) -> RateLimitResult:
+        if request_number > self.limit:
+            return RateLimitResult(allowed=False, remaining=0, retry_after=PIPE_EXPIRE_IN_SECONDS)
+        return RateLimitResult(allowed=True, remaining=self.limit - request_number, retry_after=0)
+
+
+class GCRARateLimiter(RateLimiter):
+    """Token bucket по алгоритму GCRA: один EVALSHA на запрос, без всплесков на границе окна."""
+
+    key_prefix = 'rate_limit'
+
+    def __init__(self, cache: CacheStorage, limit: int):
+        super().__init__(cache=cache, limit=limit)
+        self.emission_interval = LIMIT_PERIOD_IN_SECONDS * MS_IN_SECOND / limit
+        self.script = cache.register_script(GCRA_SCRIPT)
+
+    def hit(self, key: str) -> RateLimitResult:
+        return self.get_result(reservation=self.reserve(key=key, requested=1))
+
+    def queue_hit(self, pipeline: CachePipeline, key: str) -> Callable[[list], RateLimitResult]:
+        self.queue_reserve(pipeline=pipeline, key=key, requested=1)
+        return lambda cache_values: self.get_result(reservation=cache_values[0])
+
+    def get_result(self, reservation: list[int]) -> RateLimitResult:
+        granted, remaining, retry_after_ms = reservation
+        return RateLimitResult(
+            allowed=bool(granted),
+            remaining=remaining,
+            retry_after=math.ceil(retry_after_ms / MS_IN_SECOND),
+        )
+
+    def reserve(self, key: str, requested: int, returned: int = 0) -> list[int]:
+        return self.script(
+            keys=[f'{self.key_prefix}:{key}'],
+            args=[self.emission_interval, self.limit, requested, returned],
+        )
+
+    def queue_reserve(self, pipeline: CachePipeline, key: str, requested: int, returned: int = 0):
+        pipeline.eval_script(
+            script=GCRA_SCRIPT,
+            keys=[f'{self.key_prefix}:{key}'],
+            args=[self.emission_interval, self.limit, requested, returned],
+        )
+
+
+class LocalAllowance:
+    def __init__(self, tokens: int, remaining: int, retry_at: float, expire_at: float):
+        self.tokens = tokens
+        self.remaining = remaining
+        self.retry_at = retry_at
+        self.expire_at = expire_at
+
+
+class HybridRateLimiter(GCRARateLimiter):
+    """
+    Воркер берёт у Redis токены пачками по chunk и тратит их локально не дольше
+    sync_seconds. Неизрасходованные токены пачки возвращаются в Redis вместе со
+    следующим запросом пачки, так что редкий клиент получает весь лимит, а не
+    по токену на пачку. Теряются они, только если ключ вытеснен из локального
+    кеша (maxsize) или не запрашивался дольше периода лимита - тогда клиент
+    недополучает до chunk токенов на воркер, но лимит никогда не превышается.
+    Отказ тоже запоминается до retry-after: задушенный клиент не ходит в Redis.
+    """
+
+    def __init__(
+        self,
+        cache: CacheStorage,
+        limit: int,
+        chunk: int,
+        sync_seconds: float,
+        maxsize: int,
+    ):
+        super().__init__(cache=cache, limit=limit)
+        self.chunk = max(1, min(chunk, limit))
+        self.sync_seconds = sync_seconds
+        # Устаревшая пачка хранится весь период лимита: позже её токены и так восстановятся
+        self.allowances = TTLCache(maxsize=maxsize, ttl=LIMIT_PERIOD_IN_SECONDS)
+
+    def hit(self, key: str) -> RateLimitResult:
+        now = time.monotonic()
+        allowance = self.allowances.get(key)
+        if not self.is_usable(allowance=allowance, now=now):
+            reservation = self.reserve(
+                key=key,
+                requested=self.chunk,
+                returned=self.take_unspent(allowance=allowance),
+            )
+            allowance = self.store_allowance(key=key, now=now, reservation=reservation)
+        return self.spend(allowance=allowance, now=now)
+
+    def queue_hit(self, pipeline: CachePipeline, key: str) -> Callable[[list], RateLimitResult]:
+        now = time.monotonic()
+        allowance = self.allowances.get(key)
+        if self.is_usable(allowance=allowance, now=now):
+            return lambda cache_values: self.spend(allowance=allowance, now=now)
+
+        self.queue_reserve(
+            pipeline=pipeline,
+            key=key,
+            requested=self.chunk,
+            returned=self.take_unspent(allowance=allowance),
+        )
+        return lambda cache_values: self.spend(
+            allowance=self.store_allowance(key=key, now=now, reservation=cache_values[0]),
+            now=now,
+        )
+
+    def is_usable(self, allowance: Optional[LocalAllowance], now: float) -> bool:
+        # False - локальных токенов нет или пачка устарела, пора снова спросить Redis
+        if allowance is None or allowance.expire_at <= now:
+            return False
+        return bool(allowance.tokens) or allowance.retry_at > now
+
+    def take_unspent(self, allowance: Optional[LocalAllowance]) -> int:
+        # Обнуляем сразу: параллельный запрос того же ключа не вернёт их второй раз
+        if allowance is None:
+            return 0
+        unspent, allowance.tokens = allowance.tokens, 0
+        return unspent
+
+    def spend(self, allowance: LocalAllowance, now: float) -> RateLimitResult:
+        if not allowance.tokens:
+            return RateLimitResult(
+                allowed=False,
+                remaining=0,
+                retry_after=max(math.ceil(allowance.retry_at - now), 1),
+            )
+        allowance.tokens -= 1
+        return RateLimitResult(
+            allowed=True,
+            remaining=allowance.tokens + allowance.remaining,
+            retry_after=0,
+        )
+
+    def store_allowance(self, key: str, now: float, reservation: list[int]) -> LocalAllowance:
+        granted, remaining, retry_after_ms = reservation
+        allowance = LocalAllowance(
+            tokens=granted,
+            remaining=remaining,
+            retry_at=now + retry_after_ms / MS_IN_SECOND,
+            expire_at=now + self.sync_seconds,
+        )
+        self.allowances.set(key, allowance)
+        return allowance
+
+
+def create_rate_limiter(name: str, cache: CacheStorage, limit: int) -> RateLimiter:
+    if name == FIXED_WINDOW:
+        return FixedWindowRateLimiter(cache=cache, limit=limit)
+    if name == GCRA:
+        return GCRARateLimiter(cache=cache, limit=limit)
+    if name == HYBRID:
+        return HybridRateLimiter(
+            cache=cache,
+            limit=limit,
+            chunk=settings.RATE_LIMIT_LOCAL_CHUNK,
+            sync_seconds=settings.RATE_LIMIT_LOCAL_SYNC_SECONDS,
+            maxsize=settings.RATE_LIMIT_LOCAL_KEYS,
+        )
+    raise ValueError(f'Unknown rate limiter {name}')
+
+
+class CompiledPolicy(NamedTuple):
+    name: str
+    limit: Optional[int]
+    min_role: int
+    limiter: Optional[RateLimiter]
+
+
+class RateLimitPolicies:
+    """Таблица политик, разложенная по ключам (правило, метод) для поиска за O(1)."""
+
+    def __init__(self, policies: Iterable[RateLimitPolicy], cache: CacheStorage, limiter_name: str):
+        self.policies: dict[tuple[str, str], list[CompiledPolicy]] = defaultdict(list)
+        limiters: dict[tuple[str, Optional[int]], Optional[RateLimiter]] = {}
+
+        for policy in policies:
+            limiter_key = (policy.name, policy.limit)
+            if limiter_key not in limiters:
+                limiters[limiter_key] = create_rate_limiter(
+                    name=limiter_name,
+                    cache=cache,
+                    limit=policy.limit,
+                ) if policy.limit else None
+            compiled = CompiledPolicy(
+                name=policy.name,
+                limit=policy.limit,
+                min_role=policy.min_role,
+                limiter=limiters[limiter_key],
+            )
+            for method in policy.methods:
+                self.policies[(policy.rule, method)].append(compiled)
+
+        for compiled_policies in self.policies.values():
+            compiled_policies.sort(key=lambda compiled: compiled.min_role, reverse=True)
+        self.policies = dict(self.policies)
+
+    def resolve(self, rule: str, method: str, role: int) -> Optional[CompiledPolicy]:
+        for key in ((rule, method), (rule, ANY), (ANY, ANY)):
+            for policy in self.policies.get(key, ()):
+                if role >= policy.min_role:
+                    return policy
         return None
 
-    cache_db = get_cache_db()
-    pipe = cache_db.pipeline()
+    def check_rules(self, url_map: Map):
+        rules = {rule.rule for rule in url_map.iter_rules()}
+        unknown = {rule for rule, _ in self.policies if rule != ANY} - rules
+        if unknown:
+            raise ValueError(f'Rate limit policies refer to unknown rules: {sorted(unknown)}')
+
 
-    key = current_user.id if current_user else request.remote_addr
+@lru_cache()
+def get_rate_limit_policies() -> RateLimitPolicies:
+    return RateLimitPolicies(
+        policies=RATE_LIMIT_POLICIES,
+        cache=get_cache_db(),
+        limiter_name=settings.RATE_LIMITER,
+    )
 
-    pipe.incr(key, 1)
-    pipe.expire(key, PIPE_EXPIRE_IN_SECONDS)
 
-    pipe_result = pipe.execute()
-    request_number = pipe_result[0]
-    if request_number > settings.REQUEST_LIMIT_PER_MINUTE:
-        return make_error_response(
+def queue_rate_limit(
+    pipeline: CachePipeline,
+    jwt_data: Optional[dict],
+) -> Callable[[list], Optional[Response]]:
+    """
+    Лимит считается по sub и роли из уже разобранного токена запроса,
+    а без токена - по адресу клиента из X-Real-IP (remote_addr - это nginx).
+    """
+    if not settings.ENABLE_LIMITER:
+        return lambda cache_values: None
+
+    identity, role = get_client_ip(), 0
+    if jwt_data:
+        identity, role = jwt_data['sub'], jwt_data.get('role', 0)
+    rule = request.url_rule.rule if request.url_rule else ANY
+    policy = get_rate_limit_policies().resolve(rule=rule, method=request.method, role=role)
+    if not (policy and policy.limiter):
+        return lambda cache_values: None
+
+    parse = policy.limiter.queue_hit(pipeline=pipeline, key=f'{policy.name}:{identity}')
+
+    def apply(cache_values: list) -> Optional[Response]:
+        result = parse(cache_values)
+        g.rate_limit = (policy, result)
+        if result.allowed:
+            return None
+        response = make_error_response(
             msg=TOO_MANY_REQUESTS,
             status=HTTPStatus.TOO_MANY_REQUESTS,
         )
+        response.headers['Retry-After'] = str(result.retry_after)
+        return response
+
+    return apply
+
+
+def set_rate_limit_headers(response: Response) -> Response:
+    rate_limit_result = g.get('rate_limit')
+    if rate_limit_result is not None:
+        policy, result = rate_limit_result
+        response.headers['X-RateLimit-Limit'] = str(policy.limit)
+        response.headers['X-RateLimit-Remaining'] = str(result.remaining)
+    return response
@@ -0,0 +1,78 @@
+"""refresh_tokens_jti
+
+Revision ID: 5b2f9c81d3e7
+Revises: 0e6b7e6168f6
+Create Date: 2022-11-14 19:02:41.518204
+
+"""
+from alembic import op
+import jwt
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5b2f9c81d3e7'
+down_revision = '0e6b7e6168f6'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+refresh_tokens = sa.table(
+    'refresh_tokens',
+    sa.column('id', postgresql.UUID(as_uuid=True)),
+    sa.column('token', sa.String),
+    sa.column('jti', sa.String),
+)
+
+
+def update_batch(connection, rows):
+    jtis, invalid_ids = [], []
+    for row_id, token in rows:
+        try:
+            jtis.append((row_id, jwt.decode(token, options={'verify_signature': False})['jti']))
+        except (jwt.InvalidTokenError, KeyError):
+            invalid_ids.append(row_id)
+
+    # Вся пачка - одним UPDATE ... FROM (VALUES ...) и одним DELETE.
+    # Значения в VALUES приходят текстом, поэтому id приводится к uuid явно
+    if jtis:
+        batch = sa.values(
+            sa.column('id', postgresql.UUID(as_uuid=True)),
+            sa.column('jti', sa.String),
+            name='batch',
+        ).data(jtis)
+        connection.execute(
+            refresh_tokens.update()
+            .where(refresh_tokens.c.id == sa.cast(batch.c.id, postgresql.UUID(as_uuid=True)))
+            .values(jti=batch.c.jti),
+        )
+    if invalid_ids:
+        connection.execute(refresh_tokens.delete().where(refresh_tokens.c.id.in_(invalid_ids)))
+
+
+def upgrade():
+    op.add_column('refresh_tokens', sa.Column('jti', sa.String(length=36), nullable=True))
+
+    # jti достаём из уже сохранённых токенов: подпись здесь не важна
+    connection = op.get_bind()
+    query = sa.select(refresh_tokens.c.id, refresh_tokens.c.token).order_by(refresh_tokens.c.id)
+    rows = connection.execute(query.limit(BATCH_SIZE)).fetchall()
+    while rows:
+        update_batch(connection=connection, rows=rows)
+        rows = connection.execute(
+            query.where(refresh_tokens.c.id > rows[-1].id).limit(BATCH_SIZE),
+        ).fetchall()
+
+    op.alter_column('refresh_tokens', 'jti', nullable=False)
+    op.create_index(op.f('ix_refresh_tokens_jti'), 'refresh_tokens', ['jti'], unique=True)
+    op.drop_column('refresh_tokens', 'token')
+
+
+def downgrade():
+    # Сами токены не восстановить, поэтому все сессии сбрасываются
+    op.add_column('refresh_tokens', sa.Column('token', sa.String(), nullable=True))
+    op.execute(refresh_tokens.delete())
+    op.alter_column('refresh_tokens', 'token', nullable=False)
+    op.drop_index(op.f('ix_refresh_tokens_jti'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'jti')
@@ -0,0 +1,35 @@
+"""refresh_tokens_to_index
+
+Revision ID: c41d7e0a9b62
+Revises: 5b2f9c81d3e7
+Create Date: 2022-11-16 11:47:09.203817
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e0a9b62'
+down_revision = '5b2f9c81d3e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Таблица большая: строим индекс без блокировки записи
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_refresh_tokens_to'),
+            'refresh_tokens',
+            ['to'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_refresh_tokens_to'),
+            table_name='refresh_tokens',
+            postgresql_concurrently=True,
+        )
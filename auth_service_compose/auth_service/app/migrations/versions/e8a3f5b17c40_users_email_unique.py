@@ -0,0 +1,23 @@
+"""users_email_unique
+
+Revision ID: e8a3f5b17c40
+Revises: c41d7e0a9b62
+Create Date: 2022-11-20 13:05:52.664730
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e8a3f5b17c40'
+down_revision = 'c41d7e0a9b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Упадёт, если в базе уже есть пользователи с одинаковой почтой: их нужно разобрать вручную
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_users_email'), table_name='users')
@@ -0,0 +1,41 @@
+"""users_case_insensitive_identity
+
+Revision ID: f2b6d0c94e18
+Revises: e8a3f5b17c40
+Create Date: 2022-11-22 10:31:17.482095
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f2b6d0c94e18'
+down_revision = 'e8a3f5b17c40'
+branch_labels = None
+depends_on = None
+
+
+def check_duplicates(column: str):
+    duplicates = op.get_bind().execute(sa.text(
+        f'SELECT lower({column}) FROM users GROUP BY lower({column}) HAVING count(*) > 1',
+    )).scalars().all()
+    if duplicates:
+        # Каких пользователей объединять, решает человек, а не миграция
+        raise RuntimeError(
+            f'Users with {column} differing only by case must be merged first: {duplicates}',
+        )
+
+
+def upgrade():
+    check_duplicates('login')
+    check_duplicates('email')
+    op.create_index('ix_users_login_lower', 'users', [sa.text('lower(login)')], unique=True)
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+    # Уникальность почты без учёта регистра покрывает и точное совпадение
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+
+
+def downgrade():
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.drop_index('ix_users_email_lower', table_name='users')
+    op.drop_index('ix_users_login_lower', table_name='users')
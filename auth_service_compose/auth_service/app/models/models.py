@@ -2,10 +2,11 @@ import uuid
 from enum import Enum
 
 from db.db import sqlalchemy
+from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy_serializer import SerializerMixin
-from werkzeug.security import check_password_hash, generate_password_hash
+from utils.password_hasher import get_password_hasher
 
 
 class ActionsEnum(Enum):
@@ -78,11 +79,20 @@ class User(sqlalchemy.Model, IdMixin, SerializerMixin):
 
     oauth = sqlalchemy.relation('Oauth')
 
+    # Логин и почта уникальны без учёта регистра, поиск по lower() идёт по индексу
+    __table_args__ = (
+        sqlalchemy.Index('ix_users_login_lower', func.lower(login), unique=True),
+        sqlalchemy.Index('ix_users_email_lower', func.lower(email), unique=True),
+    )
+
     def set_password(self, password: str):  # noqa: WPS615
-        self.password = generate_password_hash(password)  # noqa: WPS601
+        self.password = get_password_hasher().hash(password)  # noqa: WPS601
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return get_password_hasher().verify(self.password, password)
+
+    def password_needs_rehash(self) -> bool:
+        return get_password_hasher().needs_rehash(self.password)
 
     def __repr__(self):
         return f'<User {self.login}>'
@@ -101,9 +111,9 @@ class UserIdMixin(object):
 class RefreshToken(sqlalchemy.Model, IdMixin, UserIdMixin, SerializerMixin):  # noqa: WPS215
     __tablename__ = 'refresh_tokens'
 
-    token = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    jti = sqlalchemy.Column(sqlalchemy.String(36), nullable=False, unique=True, index=True)
     from_ = sqlalchemy.Column(sqlalchemy.TIMESTAMP, nullable=False)
-    to = sqlalchemy.Column(sqlalchemy.TIMESTAMP, nullable=False)
+    to = sqlalchemy.Column(sqlalchemy.TIMESTAMP, nullable=False, index=True)
 
 
 class Log(sqlalchemy.Model, UserIdMixin, SerializerMixin):
@@ -14,3 +14,6 @@ CANT_FIND_USER = "Can't find user"
 BAD_REQUEST = 'Bad request'
 CANT_FIND_ROLE = "Can't find role"
 EMAIL_IS_NOT_CONFIRMED = 'EMAIL IS NOT CONFIRMED'
+TOO_MANY_TOKENS = 'Too many tokens'
+TOKEN_IS_NOT_VALID = 'Token is not valid'  # noqa: S105
+TOO_MANY_LOGIN_ATTEMPTS = 'Too many login attempts'
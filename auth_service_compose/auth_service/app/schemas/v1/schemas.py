@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel
 from pydantic.types import UUID4
@@ -38,3 +39,18 @@ class Password(BaseModel):
 
 class ConfirmURL(BaseModel):
     url: str
+
+
+class Availability(BaseModel):
+    login: Optional[bool]
+    email: Optional[bool]
+
+
+class IntrospectedToken(BaseModel):
+    active: bool
+    status: str
+    claims: Optional[dict]
+
+
+class Introspection(BaseModel):
+    items: list[IntrospectedToken]  # noqa: WPS110
@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+from core.settings import settings
+from db.cache_db import get_cache_db
+from db.db import get_db
+from extensions.tracer import trace_decorator
+from flask import Flask
+from models import models
+from services.base_cache import BaseCacheStorage
+from services.base_main import BaseMainStorage
+from sqlalchemy import func
+from utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+MILLISECONDS_IN_SECOND = 1000
+
+
+class AvailabilityService(BaseCacheStorage, BaseMainStorage):
+    """
+    Проверка, свободны ли логин и почта. Каждый воркер держит фильтры Блума
+    занятых значений: «точно свободно» отвечаем без Postgres, в базу идём только
+    при «возможно занято». Фильтры собираются из таблицы в фоновом потоке, а
+    регистрации во всех воркерах приходят через Redis Stream. Пока фильтры не
+    собраны или поток потерян, проверка идёт в Postgres.
+    """
+
+    stream = 'registered_identities'
+    # Поток нужен, только чтобы не пропустить регистрации за время чтения таблицы
+    stream_retention_in_seconds = 3600
+    load_batch_size = 10_000
+    read_batch_size = 1000
+    block_in_milliseconds = 5000
+    retry_in_seconds = 1
+
+    def __init__(self, capacity: int, error_rate: float, **kwargs):
+        super().__init__(**kwargs)
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self.logins: Optional[BloomFilter] = None
+        self.emails: Optional[BloomFilter] = None
+        self.last_id = '0'
+        self.is_ready = False
+        self.app: Optional[Flask] = None
+        self.follower: Optional[threading.Thread] = None
+
+    @trace_decorator()
+    def is_login_available(self, login: str) -> bool:
+        if self.is_ready and login.lower() not in self.logins:
+            return True
+        return not self.get_user_by(self.model.login, login)
+
+    @trace_decorator()
+    def is_email_available(self, email: str) -> bool:
+        if self.is_ready and email.lower() not in self.emails:
+            return True
+        return not self.get_user_by(self.model.email, email)
+
+    def get_user_by(self, column, identity: str):
+        return self.get_query().filter(func.lower(column) == func.lower(identity)).first()
+
+    @trace_decorator()
+    def add(self, login: Optional[str] = None, email: Optional[str] = None):
+        if not settings.ENABLE_AVAILABILITY_FILTER:
+            return
+        fields = {}
+        if login:
+            fields['login'] = login.lower()
+        if email:
+            fields['email'] = email.lower()
+        if not fields:
+            return
+
+        # Свой фильтр пополняем сразу, фильтры остальных воркеров - через поток.
+        # Запись в таблице уже закоммичена, поэтому пропустить её не может ни поток, ни загрузка
+        if self.logins is not None and 'login' in fields:
+            self.logins.add(fields['login'])
+        if self.emails is not None and 'email' in fields:
+            self.emails.add(fields['email'])
+        self.cache.stream_add(stream=self.stream, fields=fields, min_id=self.get_oldest_actual_id())
+
+    def start(self, app: Flask):
+        if self.follower:
+            return
+        self.app = app
+        self.follower = threading.Thread(
+            target=self.follow,
+            name='availability-filter',
+            daemon=True,
+        )
+        self.follower.start()
+
+    def follow(self):
+        while True:  # noqa: WPS457
+            try:
+                with self.app.app_context():
+                    self.load()
+                self.is_ready = True
+                # Переполненный фильтр даёт слишком много ложных «занято»: собираем его заново
+                while not (self.logins.is_full() or self.emails.is_full()):
+                    self.consume(
+                        entries=self.cache.stream_read(
+                            stream=self.stream,
+                            last_id=self.last_id,
+                            block=self.block_in_milliseconds,
+                            count=self.read_batch_size,
+                        ),
+                    )
+            except Exception as error:
+                logger.warning('Availability filter lost the stream: %s', error)
+                self.is_ready = False
+                time.sleep(self.retry_in_seconds)
+
+    def load(self):
+        # Позиция в потоке запоминается до чтения таблицы: регистрации после неё
+        # дочитаются из потока, а более ранние уже закоммичены и попадут в выборку
+        last_id = self.cache.stream_last_id(stream=self.stream)
+        users_count = self.count(self.get_query())
+        self.capacity = max(self.capacity, users_count * 2)
+        logins = BloomFilter(capacity=self.capacity, error_rate=self.error_rate)
+        emails = BloomFilter(capacity=self.capacity, error_rate=self.error_rate)
+
+        query = self.get_query().with_entities(self.model.login, self.model.email)
+        for login, email in query.yield_per(self.load_batch_size):
+            logins.add(login.lower())
+            emails.add(email.lower())
+
+        self.logins, self.emails = logins, emails
+        self.last_id = last_id
+
+    def consume(self, entries: list):
+        for entry_id, fields in entries:
+            if b'login' in fields:
+                self.logins.add(fields[b'login'].decode('utf-8'))
+            if b'email' in fields:
+                self.emails.add(fields[b'email'].decode('utf-8'))
+            self.last_id = entry_id.decode('utf-8')
+
+    def get_oldest_actual_id(self) -> str:
+        oldest = datetime.now(timezone.utc).timestamp() - self.stream_retention_in_seconds
+        return str(int(oldest * MILLISECONDS_IN_SECOND))
+
+
+@lru_cache()
+def get_availability_service() -> AvailabilityService:
+    return AvailabilityService(
+        capacity=settings.AVAILABILITY_FILTER_CAPACITY,
+        error_rate=settings.AVAILABILITY_FILTER_ERROR_RATE,
+        cache=get_cache_db(),
+        db=get_db(),
+        db_model=models.User,
+    )
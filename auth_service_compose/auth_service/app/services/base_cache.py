@@ -1,5 +1,6 @@
 import json
 from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
 
 from extensions.tracer import trace_decorator
 from redis import Redis  # type: ignore
@@ -15,10 +16,72 @@ class CachePipeline(ABC):
     def expire(self, key: str, expire: int, **kwargs):
         pass  # noqa: WPS420
 
+    @abstractmethod
+    def set(self, key: str, cache_value: str, expire: int, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def stream_add(self, stream: str, fields: dict, min_id: Optional[str] = None, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def get(self, key: str, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def delete(self, key: str, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def ttl(self, key: str, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def expire_at(self, key: str, when: int, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def set_add(self, key: str, members: list[str], **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def set_is_member(self, key: str, member: str, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def eval_script(self, script: str, keys: list[str], args: list, **kwargs):
+        pass  # noqa: WPS420
+
     @abstractmethod
     def execute(self, **kwargs):
         pass  # noqa: WPS420
 
+    @abstractmethod
+    def __len__(self) -> int:
+        pass  # noqa: WPS420
+
+
+class PipelineBatch:
+    """
+    Команды нескольких независимых проверок одним пайплайном.
+    Каждая проверка ставит свои команды и возвращает разборщик,
+    который после execute получает только свои ответы.
+    """
+
+    def __init__(self, pipeline: CachePipeline):
+        self.pipeline = pipeline
+        self.parsers: list[tuple[int, int, Callable[[list], Any]]] = []
+
+    def add(self, queue: Callable[[CachePipeline], Callable[[list], Any]]) -> int:
+        start = len(self.pipeline)
+        parse = queue(self.pipeline)
+        self.parsers.append((start, len(self.pipeline), parse))
+        return len(self.parsers) - 1
+
+    def execute(self) -> list:
+        cache_values = self.pipeline.execute() if len(self.pipeline) else []
+        return [parse(cache_values[start:end]) for start, end, parse in self.parsers]
+
 
 class CacheStorage(ABC):
     @abstractmethod
@@ -29,6 +92,18 @@ class CacheStorage(ABC):
     def set(self, key: str, cache_value: str, expire: int, **kwargs):
         pass  # noqa: WPS420
 
+    @abstractmethod
+    def delete(self, key: str, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def mget(self, keys: list[str], **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, **kwargs):
+        pass  # noqa: WPS420
+
     @abstractmethod
     def close(self):
         pass  # noqa: WPS420
@@ -37,6 +112,42 @@ class CacheStorage(ABC):
     def pipeline(self):
         pass  # noqa: WPS420
 
+    @abstractmethod
+    def stream_add(self, stream: str, fields: dict, min_id: Optional[str] = None, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def stream_range(self, stream: str, start: str, count: int, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def stream_read(self, stream: str, last_id: str, block: int, count: int, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def stream_last_id(self, stream: str, **kwargs) -> str:
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def scan(self, match: str, count: int, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def set_scan(self, key: str, count: int, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def memory_used(self, **kwargs) -> int:
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def commands_processed(self, **kwargs) -> int:
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def register_script(self, script: str, **kwargs):
+        pass  # noqa: WPS420
+
 
 class BaseRedisPipeline(CachePipeline):
     def __init__(self, pipeline: Pipeline):
@@ -48,9 +159,40 @@ class BaseRedisPipeline(CachePipeline):
     def expire(self, key: str, expire: int, **kwargs):
         self.pipeline.expire(key, expire)
 
+    def set(self, key: str, cache_value: str, expire: int, **kwargs):
+        self.pipeline.set(name=key, value=cache_value, ex=expire)
+
+    def stream_add(self, stream: str, fields: dict, min_id: Optional[str] = None, **kwargs):
+        self.pipeline.xadd(name=stream, fields=fields, minid=min_id)
+
+    def get(self, key: str, **kwargs):
+        self.pipeline.get(name=key)
+
+    def delete(self, key: str, **kwargs):
+        self.pipeline.delete(key)
+
+    def ttl(self, key: str, **kwargs):
+        self.pipeline.ttl(name=key)
+
+    def expire_at(self, key: str, when: int, **kwargs):
+        self.pipeline.expireat(name=key, when=when)
+
+    def set_add(self, key: str, members: list[str], **kwargs):
+        self.pipeline.sadd(key, *members)
+
+    def set_is_member(self, key: str, member: str, **kwargs):
+        self.pipeline.sismember(name=key, value=member)
+
+    def eval_script(self, script: str, keys: list[str], args: list, **kwargs):
+        # В пайплайне EVALSHA redis-py предваряет лишним SCRIPT EXISTS, EVAL обходится без него
+        self.pipeline.eval(script, len(keys), *keys, *args)
+
     def execute(self):
         return self.pipeline.execute()
 
+    def __len__(self) -> int:
+        return len(self.pipeline)
+
 
 class BaseRedisStorage(CacheStorage):
     def __init__(self, redis: Redis):
@@ -62,12 +204,57 @@ class BaseRedisStorage(CacheStorage):
     def set(self, key: str, cache_value: str, expire: int, **kwargs):
         return self.redis.set(name=key, value=cache_value, ex=expire)
 
+    def delete(self, key: str, **kwargs):
+        return self.redis.delete(key)
+
+    def mget(self, keys: list[str], **kwargs):
+        return self.redis.mget(keys)
+
+    def incr(self, key: str, amount: int = 1, **kwargs):
+        return self.redis.incr(name=key, amount=amount)
+
     def close(self):
         self.redis.close()
 
     def pipeline(self) -> CachePipeline:
         return BaseRedisPipeline(pipeline=self.redis.pipeline())
 
+    def stream_add(self, stream: str, fields: dict, min_id: Optional[str] = None, **kwargs):
+        return self.redis.xadd(name=stream, fields=fields, minid=min_id)
+
+    def stream_range(self, stream: str, start: str, count: int, **kwargs):
+        return self.redis.xrange(name=stream, min=start, count=count)
+
+    def stream_read(self, stream: str, last_id: str, block: int, count: int, **kwargs):
+        response = self.redis.xread(streams={stream: last_id}, count=count, block=block)
+        if not response:
+            return []
+        _, entries = response[0]
+        return entries
+
+    def stream_last_id(self, stream: str, **kwargs) -> str:
+        entries = self.redis.xrevrange(name=stream, count=1)
+        if not entries:
+            return '0'
+        entry_id, _ = entries[0]
+        return entry_id.decode('utf-8')
+
+    def scan(self, match: str, count: int, **kwargs):
+        return self.redis.scan_iter(match=match, count=count)
+
+    def set_scan(self, key: str, count: int, **kwargs):
+        return self.redis.sscan_iter(name=key, count=count)
+
+    def memory_used(self, **kwargs) -> int:
+        return self.redis.info('memory')['used_memory']
+
+    def commands_processed(self, **kwargs) -> int:
+        return self.redis.info('stats')['total_commands_processed']
+
+    def register_script(self, script: str, **kwargs):
+        # Вызывается как script(keys=[...], args=[...]): EVALSHA, при отсутствии в кеше - EVAL
+        return self.redis.register_script(script)
+
 
 class BaseCacheStorage:
     def __init__(self, cache: CacheStorage, **kwargs):
@@ -93,6 +280,10 @@ class BaseCacheStorage:
             expire=self.CACHE_EXPIRE_IN_SECONDS if expire is None else expire,
         )
 
+    @trace_decorator()
+    def delete_item_from_cache(self, cache_key: str):
+        self.cache.delete(key=cache_key)
+
     @trace_decorator()
     def get_items_from_cache(self, cache_key: str, model):
         cache_data = self.cache.get(key=cache_key)
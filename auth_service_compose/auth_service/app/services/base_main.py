@@ -5,6 +5,8 @@ from typing import Optional
 
 from extensions.tracer import trace_decorator
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Query
 
 
@@ -58,6 +60,14 @@ class MainStorage(ABC):  # noqa: WPS214
     def create(self, model, need_commit: bool = True, **kwargs):
         pass  # noqa: WPS420
 
+    @abstractmethod
+    def create_if_not_exists(self, model, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def bulk_create(self, model, rows: list[dict], **kwargs):
+        pass  # noqa: WPS420
+
     @abstractmethod
     def update(self, item_id: str, model, **kwargs):
         pass  # noqa: WPS420
@@ -66,6 +76,10 @@ class MainStorage(ABC):  # noqa: WPS214
     def commit(self, **kwargs):
         pass  # noqa: WPS420
 
+    @abstractmethod
+    def rollback(self, **kwargs):
+        pass  # noqa: WPS420
+
     @abstractmethod
     def add(self, *args, **kwargs):
         pass  # noqa: WPS420
@@ -74,6 +88,18 @@ class MainStorage(ABC):  # noqa: WPS214
     def delete(self, item_id: str, model, **kwargs):
         pass  # noqa: WPS420
 
+    @abstractmethod
+    def delete_by(self, model, **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def delete_returning(self, model, columns: list[str], **kwargs):
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def delete_first(self, model, *criterion, order_by, limit: int, **kwargs):
+        pass  # noqa: WPS420
+
     @abstractmethod
     def get_all(self, **kwargs):  # noqa: WPS463
         pass  # noqa: WPS420
@@ -118,6 +144,23 @@ class BaseSQLAlchemyStorage(MainStorage):  # noqa: WPS214
             self.commit()
         return entity
 
+    def create_if_not_exists(self, model, **kwargs):
+        # INSERT ... ON CONFLICT DO NOTHING RETURNING: при конфликте вернётся None
+        query = (
+            insert(model)
+            .values(**kwargs)
+            .on_conflict_do_nothing()
+            .returning(*model.__table__.c)
+        )
+        created = self.db.session.execute(query).first()
+        self.commit()
+        return created
+
+    def bulk_create(self, model, rows: list[dict], **kwargs):
+        # Один INSERT ... VALUES (...), (...) на всю пачку
+        self.db.session.execute(insert(model).values(rows))
+        self.commit()
+
     def update(self, item_id: str, model, **kwargs):
         model.query.filter_by(id=item_id).update(kwargs)
         self.commit()
@@ -137,6 +180,9 @@ class BaseSQLAlchemyStorage(MainStorage):  # noqa: WPS214
     def commit(self, **kwargs):
         return self.db.session.commit(**kwargs)
 
+    def rollback(self, **kwargs):
+        return self.db.session.rollback()
+
     def add(self, *args, **kwargs):
         return self.db.session.add(*args)
 
@@ -144,6 +190,29 @@ class BaseSQLAlchemyStorage(MainStorage):  # noqa: WPS214
         model.query.filter_by(id=item_id).delete()
         self.commit()
 
+    def delete_by(self, model, **kwargs):
+        model.query.filter_by(**kwargs).delete()
+        self.commit()
+
+    def delete_returning(self, model, columns: list[str], **kwargs):
+        # Один DELETE ... RETURNING вместо выборки и удаления по одному
+        query = delete(model).filter_by(**kwargs).returning(
+            *[getattr(model, column) for column in columns],
+        )
+        deleted = self.db.session.execute(query).fetchall()
+        self.commit()
+        return deleted
+
+    def delete_first(self, model, *criterion, order_by, limit: int, **kwargs):
+        # Удаляет не больше limit строк, чтобы не держать долгие блокировки
+        ids = select(model.id).where(*criterion).order_by(order_by).limit(limit)
+        query = delete(model).where(model.id.in_(ids)).execution_options(
+            synchronize_session=False,
+        )
+        deleted = self.db.session.execute(query).rowcount
+        self.commit()
+        return deleted
+
     def get_all(self, model, **kwargs):
         return model.query.all()
 
@@ -176,6 +245,24 @@ class BaseMainStorage:  # noqa: WPS214
     def delete(self, item_id: str):
         return self.db.delete(item_id=item_id, model=self.model)
 
+    @trace_decorator()
+    def delete_by(self, **kwargs):
+        return self.db.delete_by(model=self.model, **kwargs)
+
+    @trace_decorator()
+    def delete_returning(self, columns: list[str], **kwargs):
+        return self.db.delete_returning(model=self.model, columns=columns, **kwargs)
+
+    @trace_decorator()
+    def delete_first(self, *criterion, order_by, limit: int, **kwargs):
+        return self.db.delete_first(
+            self.model,
+            *criterion,
+            order_by=order_by,
+            limit=limit,
+            **kwargs,
+        )
+
     @trace_decorator()
     def filter_by(self, _first=None, _sort_by=None, **kwargs):
         return self.db.filter_by(model=self.model, _first=_first, **kwargs)
@@ -188,6 +275,14 @@ class BaseMainStorage:  # noqa: WPS214
     def create(self, **kwargs):
         return self.db.create(model=self.model, **kwargs)
 
+    @trace_decorator()
+    def create_if_not_exists(self, **kwargs):
+        return self.db.create_if_not_exists(model=self.model, **kwargs)
+
+    @trace_decorator()
+    def bulk_create(self, rows: list[dict]):
+        return self.db.bulk_create(model=self.model, rows=rows)
+
     @trace_decorator()
     def update(self, item_id: str, **kwargs):
         return self.db.update(item_id=item_id, model=self.model, **kwargs)
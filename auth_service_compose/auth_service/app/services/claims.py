@@ -0,0 +1,78 @@
+from functools import lru_cache
+
+from core.settings import settings
+from db.cache_db import get_cache_db
+from db.db import get_db
+from extensions.tracer import trace_decorator
+from models import models
+from pydantic import BaseModel
+from services.base_cache import BaseCacheStorage
+from services.base_main import BaseMainStorage
+
+
+class CacheClaims(BaseModel):
+    role: int
+    permissions: dict
+
+
+class ClaimsService(BaseCacheStorage, BaseMainStorage):
+    """
+    Клеймы access токена (уровень старшей роли и права) кешируются под ключом,
+    в который входят глобальная версия и версия пользователя. Изменение ролей
+    лишь увеличивает версию, и старые записи просто перестают читаться.
+    """
+
+    cache_model = CacheClaims
+    claims_key_prefix = 'claims'
+    version_key_prefix = 'claims_version'
+
+    @trace_decorator()
+    def get_claims(self, user_id: str) -> CacheClaims:
+        cache_key = self.get_claims_cache_key(user_id=user_id)
+        claims = self.get_one_item_from_cache(cache_key=cache_key, model=self.cache_model)
+        if not claims:
+            claims = self.load_claims(user_id=user_id)
+            self.put_one_item_to_cache(
+                cache_key=cache_key,
+                entity=claims,
+                expire=settings.CLAIMS_CACHE_EXPIRE,
+            )
+        return claims
+
+    @trace_decorator()
+    def load_claims(self, user_id: str) -> CacheClaims:
+        user = self.get(item_id=user_id)
+        return self.cache_model(
+            role=max((role.level for role in user.roles), default=0),
+            permissions=user.permissions,
+        )
+
+    @trace_decorator()
+    def get_claims_cache_key(self, user_id: str) -> str:
+        global_version, user_version = self.cache.mget(
+            keys=[self.version_key_prefix, f'{self.version_key_prefix}:{user_id}'],
+        )
+        return '{prefix}:{user_id}:{global_version}:{user_version}'.format(
+            prefix=self.claims_key_prefix,
+            user_id=user_id,
+            global_version=int(global_version or 0),
+            user_version=int(user_version or 0),
+        )
+
+    @trace_decorator()
+    def bump_user_version(self, user_id: str):
+        self.cache.incr(key=f'{self.version_key_prefix}:{user_id}')
+
+    @trace_decorator()
+    def bump_global_version(self):
+        # Роль могла быть у кого угодно, поэтому сбрасываем клеймы всех пользователей
+        self.cache.incr(key=self.version_key_prefix)
+
+
+@lru_cache()
+def get_claims_service() -> ClaimsService:
+    return ClaimsService(
+        cache=get_cache_db(),
+        db=get_db(),
+        db_model=models.User,
+    )
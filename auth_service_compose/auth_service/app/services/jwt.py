@@ -1,27 +1,36 @@
-from datetime import datetime, timedelta, timezone
-from functools import lru_cache
-from typing import Optional
+from collections import defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from typing import Callable, Optional
 
+from core.settings import settings
 from db.cache_db import get_cache_db
 from db.db import get_db
 from extensions.tracer import trace_decorator
 from flask import Response, current_app
 from flask_jwt_extended import (create_access_token, create_refresh_token,
-                                set_access_cookies, set_refresh_cookies)
+                                decode_token, get_jti, set_access_cookies,
+                                set_refresh_cookies)
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import InvalidTokenError
 from models import models
 from pydantic import BaseModel
-from services.base_cache import BaseCacheStorage
+from services.base_cache import (BaseCacheStorage, CachePipeline,
+                                 PipelineBatch)
 from services.base_main import BaseMainStorage
 from services.refresh_token import get_refresh_token_service
+from services.revocation_filter import get_revocation_filter
 
 
-class Token(BaseModel):
-    jti: str
+class TokenIdentity(BaseModel):
+    id: str
 
 
 class JWTService(BaseCacheStorage, BaseMainStorage):
-    cache_model = Token
+    cache_model = None
     db_model = models.RefreshToken
+    epoch_key_prefix = 'revoked_before'
+    blocklist_key_prefix = 'blocklist'
 
     @trace_decorator()
     def authorize(self, response: Response, user) -> Response:
@@ -45,6 +54,12 @@ class JWTService(BaseCacheStorage, BaseMainStorage):
             fresh=True,
         )
 
+    @trace_decorator()
+    def create_access_token_from_claims(self, jwt_payload: dict) -> str:
+        # Пользователь уже проверен подписью и отзывом refresh токена,
+        # а клеймы берутся из кеша: Postgres нужен только при промахе
+        return self.create_access_token(user=TokenIdentity(id=jwt_payload['sub']))
+
     @trace_decorator()
     def create_refresh_token(self, user) -> str:
         token = create_refresh_token(identity=user)
@@ -54,26 +69,134 @@ class JWTService(BaseCacheStorage, BaseMainStorage):
 
         refresh_token_service.create_refresh_token(
             refresh_token_params={'user_id': user.id,
-                                  'token': token,
+                                  'jti': get_jti(token),
                                   'from_': now,
                                   'to': now + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']},
         )
         return token
 
     @trace_decorator()
-    def block_token(self, cache_key: str, expire: timedelta):
-        self.put_one_item_to_cache(
-            cache_key=cache_key,
-            entity=self.cache_model(jti=cache_key),
-            expire=expire,
-        )
+    def block_tokens(self, tokens: dict[str, int]):
+        # Все jti пишутся в Redis одним пайплайном
+        pipeline = self.cache.pipeline()
+        self.put_to_blocklist(pipeline=pipeline, tokens=tokens)
+        get_revocation_filter().publish(jtis=list(tokens), pipeline=pipeline)
+        pipeline.execute()
+
+    def put_to_blocklist(self, pipeline: CachePipeline, tokens: dict[str, int]):
+        # Вместо ключа с JSON на каждый токен - множество jti на каждый час истечения:
+        # у множества один TTL, и оно исчезает, когда истекут все токены в нём
+        buckets = defaultdict(list)
+        for jti, exp in tokens.items():
+            buckets[exp // settings.BLOCKLIST_BUCKET_SECONDS].append(jti)
+
+        for bucket, jtis in buckets.items():
+            key = f'{self.blocklist_key_prefix}:{bucket}'
+            pipeline.set_add(key=key, members=jtis)
+            pipeline.expire_at(key=key, when=(bucket + 1) * settings.BLOCKLIST_BUCKET_SECONDS)
+
+    def get_blocklist_key(self, exp: int) -> str:
+        return f'{self.blocklist_key_prefix}:{exp // settings.BLOCKLIST_BUCKET_SECONDS}'
+
+    @trace_decorator()
+    def block_user_tokens(self, user_id: str, access_payload: dict):
+        refresh_tokens = get_refresh_token_service().pop_refresh_tokens(user_id=user_id)
+
+        tokens = {access_payload['jti']: access_payload['exp']}
+        tokens.update({
+            refresh_token.jti: int(refresh_token.to.replace(tzinfo=timezone.utc).timestamp())
+            for refresh_token in refresh_tokens
+        })
+        self.block_tokens(tokens=tokens)
 
     @trace_decorator()
-    def get_blocked_token(self, cache_key: str):
-        return self.get_one_item_from_cache(
-            cache_key=cache_key,
-            model=self.cache_model,
+    def revoke_user_tokens(self, user_id: str):
+        # Невалидны токены, выпущенные до этой секунды: iat хранится с точностью
+        # до секунды, и вход в ту же секунду после выхода должен остаться в силе
+        epoch = int(datetime.now(timezone.utc).timestamp())
+        self.cache.set(
+            key=f'{self.epoch_key_prefix}:{user_id}',
+            cache_value=str(epoch),
+            expire=current_app.config['JWT_REFRESH_TOKEN_EXPIRES'],
         )
+        get_revocation_filter().publish_epoch(user_id=user_id, epoch=epoch)
+
+    @trace_decorator()
+    def is_token_revoked(self, jwt_payload: dict) -> bool:
+        return self.get_revoked_tokens(jwt_payloads=[jwt_payload])[0]
+
+    @trace_decorator()
+    def verify_access_token(self, encoded_token: str) -> Optional[dict]:
+        # Только подпись, срок и отзыв: без похода за пользователем в Postgres
+        try:
+            jwt_payload = decode_token(encoded_token)
+        except (InvalidTokenError, JWTExtendedException):
+            return None
+        if jwt_payload.get('type') != 'access' or self.is_token_revoked(jwt_payload=jwt_payload):
+            return None
+        return jwt_payload
+
+    @trace_decorator()
+    def get_revoked_tokens(self, jwt_payloads: list[dict]) -> list[bool]:
+        # Всё, на что не ответил локальный фильтр, проверяем одним пайплайном
+        batch = PipelineBatch(pipeline=self.cache.pipeline())
+        batch.add(partial(self.queue_revocation_check, jwt_payloads=jwt_payloads))
+        return batch.execute()[0]
+
+    def queue_revocation_check(  # noqa: WPS210
+        self,
+        pipeline: CachePipeline,
+        jwt_payloads: list[dict],
+    ) -> Callable[[list], list[bool]]:
+        revocation_filter = get_revocation_filter()
+        check_epochs = settings.ENABLE_REVOCATION_EPOCH
+        check_legacy = settings.BLOCKLIST_CHECK_LEGACY
+        epochs = revocation_filter.epochs
+
+        user_ids = []
+        if check_epochs and not revocation_filter.is_ready:
+            user_ids = list({jwt_payload['sub'] for jwt_payload in jwt_payloads})
+        maybe_revoked = [
+            jwt_payload for jwt_payload in jwt_payloads
+            if revocation_filter.might_be_revoked(jwt_payload['jti'])
+        ]
+
+        for user_id in user_ids:
+            pipeline.get(key=f'{self.epoch_key_prefix}:{user_id}')
+        for jwt_payload in maybe_revoked:
+            pipeline.set_is_member(
+                key=self.get_blocklist_key(exp=jwt_payload['exp']),
+                member=jwt_payload['jti'],
+            )
+            if check_legacy:
+                pipeline.get(key=jwt_payload['jti'])
+
+        def parse(cache_values: list) -> list[bool]:
+            user_epochs = epochs
+            if user_ids:
+                user_epochs = {
+                    user_id: int(epoch)
+                    for user_id, epoch in zip(user_ids, cache_values)
+                    if epoch
+                }
+            checks_per_token = 2 if check_legacy else 1
+            blocked = cache_values[len(user_ids):]
+            blocked_jtis = {
+                jwt_payload['jti']
+                for index, jwt_payload in enumerate(maybe_revoked)
+                if any(blocked[index * checks_per_token:(index + 1) * checks_per_token])
+            }
+
+            revoked = []
+            for jwt_payload in jwt_payloads:
+                epoch = user_epochs.get(jwt_payload['sub']) if check_epochs else None
+                revoked.append(
+                    jwt_payload['jti'] in blocked_jtis
+                    or (epoch is not None and jwt_payload['iat'] < epoch),
+                )
+            return revoked
+
+        return parse
 
 
 @lru_cache()
@@ -0,0 +1,134 @@
+import ipaddress
+import socket
+import time
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Union
+
+from core.settings import settings
+from db.cache_db import get_cache_db
+from extensions.tracer import trace_decorator
+from flask import request
+from services.base_cache import BaseCacheStorage
+from utils.ttl_cache import TTLCache
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+# Адрес контейнера nginx меняется при пересоздании, поэтому имена разрешаются заново
+PROXIES_RESOLVE_INTERVAL_IN_SECONDS = 60
+trusted_proxies = TTLCache(maxsize=1, ttl=PROXIES_RESOLVE_INTERVAL_IN_SECONDS)
+
+
+class LoginGuardService(BaseCacheStorage):
+    """
+    Счётчики неудачных входов по логину и по IP. После порога вход блокируется
+    на окно, которое удваивается с каждой следующей неудачей. Проверка блокировки -
+    один MGET до запроса в Postgres и вычисления хеша пароля.
+    """
+
+    failures_key_prefix = 'login_failures'
+    lock_key_prefix = 'login_lock'
+
+    @trace_decorator()
+    def get_retry_after(self, login: str, ip: str) -> Optional[int]:
+        locked_until = [
+            int(lock) for lock in self.cache.mget(keys=self.get_lock_keys(login=login, ip=ip))
+            if lock
+        ]
+        if not locked_until:
+            return None
+        retry_after = max(locked_until) - int(time.time())
+        return retry_after if retry_after > 0 else None
+
+    @trace_decorator()
+    def register_failure(self, login: str, ip: str):
+        failures_keys = self.get_failures_keys(login=login, ip=ip)
+        pipeline = self.cache.pipeline()
+        for failures_key in failures_keys:
+            pipeline.incr(key=failures_key, amount=1)
+            pipeline.expire(key=failures_key, expire=settings.LOGIN_FAILURES_WINDOW)
+        failures = pipeline.execute()[::2]
+
+        thresholds = (settings.LOGIN_FAILURES_THRESHOLD, settings.LOGIN_IP_FAILURES_THRESHOLD)
+        pipeline = self.cache.pipeline()
+        is_locked = False
+        for lock_key, failures_count, threshold in zip(
+            self.get_lock_keys(login=login, ip=ip), failures, thresholds,
+        ):
+            if failures_count < threshold:
+                continue
+            lock_time = min(
+                settings.LOGIN_LOCK_SECONDS * 2 ** (failures_count - threshold),
+                settings.LOGIN_LOCK_MAX_SECONDS,
+            )
+            pipeline.set(
+                key=lock_key,
+                cache_value=str(int(time.time()) + lock_time),
+                expire=lock_time,
+            )
+            is_locked = True
+        if is_locked:
+            pipeline.execute()
+
+    @trace_decorator()
+    def reset(self, login: str):
+        # Счётчик IP не сбрасываем: с одного адреса могут подбирать разные логины
+        self.cache.delete(key=self.get_failures_keys(login=login, ip='')[0])
+
+    def get_failures_keys(self, login: str, ip: str) -> list[str]:
+        return [
+            f'{self.failures_key_prefix}:login:{login.lower()}',
+            f'{self.failures_key_prefix}:ip:{ip}',
+        ]
+
+    def get_lock_keys(self, login: str, ip: str) -> list[str]:
+        return [
+            f'{self.lock_key_prefix}:login:{login.lower()}',
+            f'{self.lock_key_prefix}:ip:{ip}',
+        ]
+
+
+def get_client_ip() -> str:
+    # За nginx remote_addr - адрес самого nginx, реальный адрес он кладёт в X-Real-IP.
+    # Остальным этот заголовок не доверяем: сервис доступен и напрямую из services_network
+    if is_trusted_proxy(request.remote_addr):
+        return request.headers.get('X-Real-IP', request.remote_addr)
+    return request.remote_addr
+
+
+def is_trusted_proxy(address: Optional[str]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in get_trusted_networks())
+
+
+def get_trusted_networks() -> list[IPNetwork]:
+    networks = trusted_proxies.get('networks')
+    if networks is None:
+        networks = list(resolve_proxies(proxies=settings.TRUSTED_PROXIES))
+        trusted_proxies.set('networks', networks)
+    return networks
+
+
+def resolve_proxies(proxies: Iterable[str]) -> Iterator[IPNetwork]:
+    for proxy in proxies:
+        try:
+            yield ipaddress.ip_network(proxy)
+        except ValueError:
+            yield from resolve_host(host=proxy)
+
+
+def resolve_host(host: str) -> Iterator[IPNetwork]:
+    try:
+        _, _, addresses = socket.gethostbyname_ex(host)
+    except OSError:
+        # Прокси не запущен: пока ему не доверяем, спросим снова при следующем разрешении
+        return
+    for address in addresses:
+        yield ipaddress.ip_network(address)
+
+
+@lru_cache()
+def get_login_guard_service() -> LoginGuardService:
+    return LoginGuardService(cache=get_cache_db())
@@ -1,14 +1,28 @@
+import atexit
+import logging
+import threading
+import time
 from datetime import datetime  # noqa: E999
 from functools import lru_cache
+from queue import Empty, Full, Queue
+from typing import Optional
 
+from core.settings import settings
 from db.cache_db import get_cache_db
 from db.db import get_db
 from extensions.tracer import trace_decorator
+from flask import Flask
 from models import models
 from pydantic import BaseModel
 from pydantic.types import UUID4
 from services.base_cache import BaseCacheStorage
 from services.base_main import BaseMainStorage
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# Метка в очереди: дописать накопленное и остановить поток записи
+STOP = object()
 
 
 class CacheLog(BaseModel):
@@ -20,12 +34,101 @@ class CacheLog(BaseModel):
 
 
 class LogsService(BaseCacheStorage, BaseMainStorage):
+    """
+    Записи журнала активности копятся в ограниченной очереди и пишутся фоновым
+    потоком (под gevent - гринлетом) пачками одним INSERT вне запроса.
+    Если очередь не разгребается, запрос пишет свою запись сам и тем самым
+    притормаживает, а при остановке воркера очередь дописывается до конца.
+    """
+
     cache_model = CacheLog
+    stop_timeout_in_seconds = 10
+
+    def __init__(  # noqa: WPS211
+            self,
+            queue_size: int,
+            batch_size: int,
+            flush_seconds: float,
+            put_timeout: float,
+            **kwargs,
+    ):
+        super().__init__(**kwargs)
+
+        self.queue: Queue = Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.put_timeout = put_timeout
+        self.app: Optional[Flask] = None
+        self.writer: Optional[threading.Thread] = None
 
     @trace_decorator()
     def create_log(self, **log_params):
-        log = self.create(**log_params)
-        return self.cache_model(**log.to_dict())
+        self.create(**log_params)
+
+    @trace_decorator()
+    def save_log(self, **log_params):
+        if self.writer:
+            try:
+                self.queue.put(log_params, timeout=self.put_timeout)
+                return
+            except Full:
+                logger.warning('Activity log queue is full, writing synchronously')
+        self.create_log(**log_params)
+
+    def start(self, app: Flask):
+        if self.writer:
+            return
+        self.app = app
+        self.writer = threading.Thread(target=self.write, name='log-writer', daemon=True)
+        self.writer.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        if not self.writer:
+            return
+        self.queue.put(STOP)
+        self.writer.join(timeout=self.stop_timeout_in_seconds)
+        self.writer = None
+
+    def write(self):
+        stopped = False
+        while not stopped:
+            batch = self.get_batch()
+            stopped = STOP in batch
+            self.flush(rows=[row for row in batch if row is not STOP])
+
+    def get_batch(self) -> list:
+        # Ждём первую запись, а следующие добираем не дольше flush_seconds
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size and batch[-1] is not STOP:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except Empty:
+                break
+        return batch
+
+    def flush(self, rows: list[dict]):
+        if not rows:
+            return
+        with self.app.app_context():
+            try:
+                self.bulk_create(rows=rows)
+            except SQLAlchemyError:
+                # Одна запись без партиции не должна утянуть за собой всю пачку
+                self.db.rollback()
+                self.flush_one_by_one(rows=rows)
+
+    def flush_one_by_one(self, rows: list[dict]):
+        for row in rows:
+            try:
+                self.bulk_create(rows=[row])
+            except SQLAlchemyError:
+                self.db.rollback()
+                logger.exception('Activity log record is lost: %s', row)
 
     @trace_decorator()
     def get_logs(  # noqa: WPS211
@@ -60,4 +163,8 @@ def get_logs_service() -> LogsService:
         cache=get_cache_db(),
         db=get_db(),
         db_model=models.Log,
+        queue_size=settings.LOG_WRITER_QUEUE_SIZE,
+        batch_size=settings.LOG_WRITER_BATCH_SIZE,
+        flush_seconds=settings.LOG_WRITER_FLUSH_SECONDS,
+        put_timeout=settings.LOG_WRITER_PUT_TIMEOUT,
     )
@@ -13,7 +13,7 @@ from services.base_main import BaseMainStorage
 class CacheRefreshToken(BaseModel):
     id: UUID4
     user_id: UUID4
-    token: str
+    jti: str
     from_: datetime
     to: datetime
 
@@ -24,7 +24,7 @@ class RefreshTokenService(BaseCacheStorage, BaseMainStorage):
 
     @trace_decorator()
     def get_refresh_tokens(self, user_id: str):
-        db_refresh_tokens = self.filter_by(user_id=user_id, sort_by='to')
+        db_refresh_tokens = self.filter_by(user_id=user_id, _sort_by='to')
         return [self.cache_model(**refresh_token.to_dict()) for refresh_token in db_refresh_tokens]
 
     @trace_decorator()
@@ -32,6 +32,26 @@ class RefreshTokenService(BaseCacheStorage, BaseMainStorage):
         refresh_token = self.create(**refresh_token_params)
         return self.cache_model(**refresh_token.to_dict())
 
+    @trace_decorator()
+    def delete_refresh_token(self, jti: str):
+        self.delete_by(jti=jti)
+
+    @trace_decorator()
+    def delete_refresh_tokens(self, user_id: str):
+        self.delete_by(user_id=user_id)
+
+    @trace_decorator()
+    def delete_expired_refresh_tokens(self, expired_before: datetime, limit: int) -> int:
+        return self.delete_first(
+            self.model.to < expired_before,
+            order_by=self.model.to,
+            limit=limit,
+        )
+
+    @trace_decorator()
+    def pop_refresh_tokens(self, user_id: str) -> list:
+        return self.delete_returning(columns=['jti', 'to'], user_id=user_id)
+
 
 @lru_cache()
 def get_refresh_token_service(
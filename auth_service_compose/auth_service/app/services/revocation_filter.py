@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+from core.settings import settings
+from db.cache_db import get_cache_db
+from extensions.tracer import trace_decorator
+from services.base_cache import BaseCacheStorage, CachePipeline, CacheStorage
+from utils.bloom_filter import BloomFilter
+from utils.iteration import batched
+
+logger = logging.getLogger(__name__)
+
+MILLISECONDS_IN_SECOND = 1000
+# Прежний формат: ключ - сам jti, значение - JSON {"jti": "..."}
+LEGACY_KEY_PATTERN = '????????-????-????-????-????????????'
+LEGACY_VALUE_PREFIX = b'{"jti"'
+
+
+class RevocationFilterService(BaseCacheStorage):
+    """
+    Локальный (в пределах воркера) фильтр Блума отозванных jti и словарь
+    эпох отзыва пользователей. Наполняется из Redis Stream, в который пишет каждый
+    воркер при блокировке токена, поэтому в Redis за проверкой идём только если
+    фильтр ответил «возможно отозван». Отозванное до появления потока
+    фильтр берёт из самого списка отозванных токенов при загрузке.
+    """
+
+    stream = 'revoked_tokens'
+    # Совпадает с JWTService.blocklist_key_prefix
+    blocklist_key_prefix = 'blocklist'
+    read_batch_size = 1000
+    block_in_milliseconds = 5000
+    retry_in_seconds = 1
+
+    def __init__(self, cache: CacheStorage, capacity: int, error_rate: float, **kwargs):
+        super().__init__(cache=cache, **kwargs)
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self.bloom_filter = BloomFilter(capacity=capacity, error_rate=error_rate)
+        self.epochs: dict[str, int] = {}
+        self.last_id = '0'
+        self.is_ready = False
+        self.follower: Optional[threading.Thread] = None
+
+    @trace_decorator()
+    def publish(self, jtis: list[str], pipeline: CachePipeline):
+        min_id = self.get_oldest_actual_id()
+        for jti in jtis:
+            if settings.ENABLE_REVOCATION_FILTER:
+                self.bloom_filter.add(jti)
+            pipeline.stream_add(stream=self.stream, fields={'jti': jti}, min_id=min_id)
+
+    @trace_decorator()
+    def publish_epoch(self, user_id: str, epoch: int):
+        if settings.ENABLE_REVOCATION_FILTER:
+            self.epochs[user_id] = epoch
+        self.cache.stream_add(
+            stream=self.stream,
+            fields={'user_id': user_id, 'epoch': epoch},
+            min_id=self.get_oldest_actual_id(),
+        )
+
+    def might_be_revoked(self, jti: str) -> bool:
+        # Пока фильтр не догнал поток, он ничего не гарантирует
+        if not self.is_ready:
+            return True
+        return jti in self.bloom_filter
+
+    def start(self):
+        if self.follower:
+            return
+        self.follower = threading.Thread(
+            target=self.follow,
+            name='revocation-filter',
+            daemon=True,
+        )
+        self.follower.start()
+
+    def follow(self):
+        while True:  # noqa: WPS457
+            try:
+                self.load()
+                self.is_ready = True
+                while not self.bloom_filter.is_full():
+                    self.consume(
+                        bloom_filter=self.bloom_filter,
+                        epochs=self.epochs,
+                        entries=self.cache.stream_read(
+                            stream=self.stream,
+                            last_id=self.last_id,
+                            block=self.block_in_milliseconds,
+                            count=self.read_batch_size,
+                        ),
+                    )
+            except Exception as error:
+                logger.warning('Revocation filter lost the stream: %s', error)
+                self.is_ready = False
+                time.sleep(self.retry_in_seconds)
+
+    def load(self):
+        # Фильтр нельзя почистить, поэтому при переполнении собираем новый
+        # из потока (старые записи в нём уже обрезаны) и подменяем старый
+        bloom_filter, epochs = self.read_stream()
+        while bloom_filter.is_full():
+            self.capacity *= 2
+            bloom_filter, epochs = self.read_stream()
+        self.bloom_filter = bloom_filter
+        self.epochs = epochs
+
+    def read_stream(self) -> tuple[BloomFilter, dict[str, int]]:
+        bloom_filter = BloomFilter(capacity=self.capacity, error_rate=self.error_rate)
+        epochs: dict[str, int] = {}
+        self.read_blocklist(bloom_filter=bloom_filter)
+        self.last_id = '0'
+        while True:  # noqa: WPS457
+            entries = self.cache.stream_range(
+                stream=self.stream,
+                start=f'({self.last_id}',
+                count=self.read_batch_size,
+            )
+            self.consume(bloom_filter=bloom_filter, epochs=epochs, entries=entries)
+            if len(entries) < self.read_batch_size:
+                return bloom_filter, epochs
+
+    def read_blocklist(self, bloom_filter: BloomFilter):
+        # Поток хранит только отзывы после его появления, более ранние лежат
+        # лишь в списке. Отозванное во время чтения попадёт в фильтр из потока
+        batch_size = self.read_batch_size
+        for key in self.cache.scan(match=f'{self.blocklist_key_prefix}:*', count=batch_size):
+            for jti in self.cache.set_scan(key=key, count=batch_size):
+                bloom_filter.add(jti.decode('utf-8'))
+
+        # Ключи прежнего формата проверяются, только пока их не перенесли
+        if not settings.BLOCKLIST_CHECK_LEGACY:
+            return
+        legacy_keys = self.cache.scan(match=LEGACY_KEY_PATTERN, count=batch_size)
+        for keys in batched(legacy_keys, batch_size):
+            for key, cache_value in zip(keys, self.cache.mget(keys=keys)):
+                # Под тем же шаблоном лежат счётчики лимитов по id пользователя
+                if cache_value and cache_value.startswith(LEGACY_VALUE_PREFIX):
+                    bloom_filter.add(key.decode('utf-8'))
+
+    def consume(self, bloom_filter: BloomFilter, epochs: dict[str, int], entries: list):
+        for entry_id, fields in entries:
+            if b'jti' in fields:
+                bloom_filter.add(fields[b'jti'].decode('utf-8'))
+            else:
+                user_id = fields[b'user_id'].decode('utf-8')
+                epochs[user_id] = max(int(fields[b'epoch']), epochs.get(user_id, 0))
+            self.last_id = entry_id.decode('utf-8')
+
+    def get_oldest_actual_id(self) -> str:
+        # Записи старше самого долгоживущего токена уже не нужны
+        oldest = datetime.now(timezone.utc) - settings.JWT_REFRESH_TOKEN_EXPIRES
+        return str(int(oldest.timestamp() * MILLISECONDS_IN_SECOND))
+
+
+@lru_cache()
+def get_revocation_filter() -> RevocationFilterService:
+    return RevocationFilterService(
+        cache=get_cache_db(),
+        capacity=settings.REVOCATION_FILTER_CAPACITY,
+        error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+    )
@@ -9,6 +9,7 @@ from pydantic import BaseModel, Field
 from pydantic.types import UUID4
 from services.base_cache import BaseCacheStorage
 from services.base_main import BaseMainStorage
+from services.claims import get_claims_service
 
 
 class CacheRole(BaseModel):
@@ -58,6 +59,12 @@ class RoleService(BaseCacheStorage, BaseMainStorage):
     @trace_decorator()
     def update_role(self, role_id: str, role_params: dict):
         self.update(item_id=role_id, **role_params)
+        get_claims_service().bump_global_version()
+
+    @trace_decorator()
+    def delete(self, item_id: str):
+        super().delete(item_id=item_id)
+        get_claims_service().bump_global_version()
 
     @trace_decorator()
     def create_role(self, role_params: dict):
@@ -1,16 +1,23 @@
 import uuid
 from functools import lru_cache  # noqa: E999
+from typing import Callable, Optional
 
 from pydantic import BaseModel
 from pydantic.types import UUID4
+from sqlalchemy import func
 
 from core.settings import settings
 from db.cache_db import get_cache_db
 from db.db import get_db, get_notify_pipeline
 from extensions.tracer import trace_decorator
 from models import models
-from services.base_cache import BaseCacheStorage
+from services.base_cache import BaseCacheStorage, CachePipeline
+from services.availability import get_availability_service
 from services.base_main import BaseMainStorage
+from services.claims import get_claims_service
+from utils.exceptions import UserAlreadyExistsError
+from utils.password_hasher import get_password_hasher
+from utils.ttl_cache import TTLCache
 from utils.utils import generate_password
 
 
@@ -33,18 +40,105 @@ class EventModel(BaseModel):
 class UserService(BaseCacheStorage, BaseMainStorage):  # noqa: WPS214
     cache_model = CacheUser
     expire_in_seconds = 600
+    user_key_prefix = 'user'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.local_cache = TTLCache(
+            maxsize=settings.USER_CACHE_SIZE,
+            ttl=settings.USER_CACHE_LOCAL_TTL,
+        )
+
+    @trace_decorator()
+    def get_current_user(self, user_id: str) -> Optional[CacheUser]:
+        # Память воркера -> Redis -> Postgres
+        user_id = str(user_id)
+        user = self.local_cache.get(user_id)
+        if user:
+            return user
+
+        cache_key = f'{self.user_key_prefix}:{user_id}'
+        user = self.get_one_item_from_cache(cache_key=cache_key, model=self.cache_model)
+        if not user:
+            user_db = self.get(item_id=user_id)
+            if not user_db:
+                return None
+            user = self.cache_model(**user_db.to_dict())
+            self.put_one_item_to_cache(
+                cache_key=cache_key,
+                entity=user,
+                expire=settings.USER_CACHE_EXPIRE,
+            )
+
+        self.local_cache.set(user_id, user)
+        return user
+
+    def queue_current_user(
+        self,
+        pipeline: CachePipeline,
+        user_id: str,
+    ) -> Callable[[list], Optional[CacheUser]]:
+        # Только память воркера и Redis: за промахом get_current_user сходит в Postgres сам
+        user_id = str(user_id)
+        user = self.local_cache.get(user_id)
+        if user:
+            return lambda cache_values: user
+
+        pipeline.get(key=f'{self.user_key_prefix}:{user_id}')
+
+        def parse(cache_values: list) -> Optional[CacheUser]:
+            if not cache_values[0]:
+                return None
+            cached_user = self.cache_model.parse_raw(cache_values[0])
+            self.local_cache.set(user_id, cached_user)
+            return cached_user
+
+        return parse
+
+    @trace_decorator()
+    def invalidate_user(self, user_id: str):
+        # Кеши других воркеров устареют сами за USER_CACHE_LOCAL_TTL
+        self.local_cache.delete(str(user_id))
+        self.delete_item_from_cache(cache_key=f'{self.user_key_prefix}:{user_id}')
+
+    @trace_decorator()
+    def update(self, item_id: str, **kwargs):
+        super().update(item_id=item_id, **kwargs)
+        self.invalidate_user(user_id=item_id)
+        if 'permissions' in kwargs:
+            get_claims_service().bump_user_version(user_id=item_id)
+        get_availability_service().add(login=kwargs.get('login'), email=kwargs.get('email'))
 
     @trace_decorator()
     def create_user(self, user_params: dict):
-        user = self.create(
-            need_commit=False,
+        # Хеш считаем до запроса, чтобы вставка была одним запросом без гонки
+        # между проверкой существования и INSERT
+        user = self.create_if_not_exists(
             login=user_params['login'],
             email=user_params['email'],
-            email_is_confirmed=user_params['email_is_confirmed'],
+            email_is_confirmed=user_params.get('email_is_confirmed', False),
+            password=get_password_hasher().hash(user_params['password']),
         )
-        user.set_password(user_params['password'])
-        self.db.commit()
-        return self.cache_model(**user.to_dict())
+        if not user:
+            raise UserAlreadyExistsError(field=self.get_taken_field(
+                login=user_params['login'],
+                email=user_params['email'],
+            ))
+        get_availability_service().add(login=user.login, email=user.email)
+        return self.cache_model(**user._mapping)  # noqa: WPS437
+
+    @trace_decorator()
+    def get_taken_field(self, login: str, email: str) -> str:
+        if self.get_by_login(login=login):
+            return 'login'
+        return 'email'
+
+    @trace_decorator()
+    def get_by_login(self, login: str) -> Optional[models.User]:
+        return self.get_query().filter(
+            func.lower(self.model.login) == func.lower(login),
+        ).first()
 
     @trace_decorator()
     def get_users(
@@ -84,11 +178,22 @@ class UserService(BaseCacheStorage, BaseMainStorage):  # noqa: WPS214
                 self.put_one_item_to_cache(cache_key=cache_key, entity=user)
         return user
 
+    @trace_decorator()
+    def check_password(self, user: models.User, password: str) -> bool:
+        if not user.check_password(password):
+            return False
+        # Пароль известен только сейчас: перехешируем его по текущей политике
+        if user.password_needs_rehash():
+            user.set_password(password)
+            self.db.commit()
+        return True
+
     @trace_decorator()
     def update_password(self, user_id: str, password: str):
         user_db = self.get(item_id=user_id)
         user_db.set_password(password)
         self.db.commit()
+        self.invalidate_user(user_id=user_id)
 
     @trace_decorator()
     def generate_password(self, user_id: str):
@@ -113,6 +218,8 @@ class UserService(BaseCacheStorage, BaseMainStorage):  # noqa: WPS214
             return False
         user = self.get(item_id=entity.user_id)
         user.email_is_confirmed = True
+        self.db.commit()
+        self.invalidate_user(user_id=entity.user_id)
         return True
 
     @trace_decorator()
@@ -146,6 +253,7 @@ class UserService(BaseCacheStorage, BaseMainStorage):  # noqa: WPS214
             user = self.get(item_id=user_id)
             user.email_is_confirmed = True
             self.db.commit()
+            self.invalidate_user(user_id=user_id)
 
 
 @lru_cache()
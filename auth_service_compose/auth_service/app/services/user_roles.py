@@ -6,7 +6,9 @@ from extensions.tracer import trace_decorator
 from models import models
 from services.base_cache import BaseCacheStorage
 from services.base_main import BaseMainStorage
+from services.claims import get_claims_service
 from services.role import CacheRole
+from services.user import get_user_service
 
 
 class UserRolesService(BaseCacheStorage, BaseMainStorage):
@@ -25,6 +27,8 @@ class UserRolesService(BaseCacheStorage, BaseMainStorage):
         self.db.add(user)
         self.db.add(role)
         self.db.commit()
+        get_user_service().invalidate_user(user_id=user_id)
+        get_claims_service().bump_user_version(user_id=user_id)
 
     @trace_decorator()
     def delete_role_from_user(self, user_id: str, role_id: str):
@@ -36,6 +40,8 @@ class UserRolesService(BaseCacheStorage, BaseMainStorage):
         self.db.add(user)
 
         self.db.commit()
+        get_user_service().invalidate_user(user_id=user_id)
+        get_claims_service().bump_user_version(user_id=user_id)
 
     @trace_decorator()
     def get_highest_role(self, user_id: str):
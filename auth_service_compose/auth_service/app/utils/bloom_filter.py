@@ -0,0 +1,48 @@
+import hashlib
+import math
+
+BITS_IN_BYTE = 8
+HASH_HALF_SIZE = 8
+
+
+class BloomFilter:
+    """
+    Вероятностное множество: может ошибиться, сказав «возможно есть»,
+    но никогда не ошибается, говоря «точно нет».
+    :param capacity: ожидаемое количество элементов
+    :param error_rate: допустимая доля ложноположительных ответов
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self.size = max(
+            BITS_IN_BYTE,
+            int(-capacity * math.log(error_rate) / (math.log(2) ** 2)),
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(self.size // BITS_IN_BYTE + 1)
+        self.count = 0
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position // BITS_IN_BYTE] |= 1 << (position % BITS_IN_BYTE)
+        self.count += 1
+
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+    def _positions(self, key: str):
+        # Двойное хеширование: k позиций из двух половин одного дайджеста
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=HASH_HALF_SIZE * 2).digest()
+        first = int.from_bytes(digest[:HASH_HALF_SIZE], 'little')
+        second = int.from_bytes(digest[HASH_HALF_SIZE:], 'little')
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[position // BITS_IN_BYTE] & (1 << (position % BITS_IN_BYTE))
+            for position in self._positions(key)
+        )
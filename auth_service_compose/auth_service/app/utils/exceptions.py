@@ -1,6 +1,28 @@
+from typing import Optional
+
+from jwt.exceptions import InvalidSignatureError
+
+
 class CantGetInitializedObjectError(Exception):
     def __init__(self, object_name: str):
         self.object_name = object_name
 
     def __str__(self):
         return f"Can't get initialized object: {self.object_name}"
+
+
+class UserAlreadyExistsError(Exception):
+    def __init__(self, field: str):
+        self.field = field
+
+    def __str__(self):
+        return f'User with this {self.field} already exists'
+
+
+class UnknownSigningKeyError(InvalidSignatureError):
+    # Подкласс InvalidTokenError: токен отклоняется как неверный, а не падает с 500
+    def __init__(self, kid: Optional[str]):
+        self.kid = kid
+
+    def __str__(self):
+        return f'Unknown signing key {self.kid}'
@@ -0,0 +1,269 @@
+import hashlib
+import hmac
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from core.settings import settings
+from gevent import get_hub, monkey
+from werkzeug.security import (check_password_hash, gen_salt,
+                               generate_password_hash)
+
+INLINE_EXECUTOR = 'inline'
+SALT_LENGTH = 16
+SCRYPT_MAX_MEMORY = 2 ** 30
+
+
+class PasswordScheme(ABC):
+    """Алгоритм хеширования вместе с его параметрами стоимости."""
+
+    name: str
+    cost_name: str
+
+    @property
+    @abstractmethod
+    def cost(self) -> int:
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def with_cost(self, cost: int) -> 'PasswordScheme':
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def hash(self, password: str) -> str:  # noqa: WPS125
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def verify(self, password_hash: str, password: str) -> bool:
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def identify(self, password_hash: str) -> bool:
+        pass  # noqa: WPS420
+
+    @abstractmethod
+    def needs_rehash(self, password_hash: str) -> bool:
+        pass  # noqa: WPS420
+
+
+class PBKDF2Scheme(PasswordScheme):
+    name = 'pbkdf2'
+    cost_name = 'PASSWORD_PBKDF2_ITERATIONS'
+    prefix = 'pbkdf2:'
+
+    def __init__(self, iterations: int):
+        self.iterations = iterations
+
+    @property
+    def cost(self) -> int:
+        return self.iterations
+
+    def with_cost(self, cost: int) -> 'PBKDF2Scheme':
+        return PBKDF2Scheme(iterations=cost)
+
+    def hash(self, password: str) -> str:  # noqa: WPS125
+        return generate_password_hash(
+            password,
+            method=f'pbkdf2:sha256:{self.iterations}',
+            salt_length=SALT_LENGTH,
+        )
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return check_password_hash(password_hash, password)
+
+    def identify(self, password_hash: str) -> bool:
+        return password_hash.startswith(self.prefix)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        method = password_hash.split('$', 1)[0]
+        return method != f'pbkdf2:sha256:{self.iterations}'
+
+
+class ScryptScheme(PasswordScheme):
+    """Хеш в формате scrypt:n:r:p$salt$hex, как у новых версий werkzeug."""
+
+    name = 'scrypt'
+    cost_name = 'PASSWORD_SCRYPT_N'
+    prefix = 'scrypt:'
+
+    def __init__(self, n: int, r: int, p: int):  # noqa: WPS111
+        self.n = n  # noqa: WPS111
+        self.r = r  # noqa: WPS111
+        self.p = p  # noqa: WPS111
+
+    @property
+    def cost(self) -> int:
+        return self.n
+
+    def with_cost(self, cost: int) -> 'ScryptScheme':
+        return ScryptScheme(n=cost, r=self.r, p=self.p)
+
+    def hash(self, password: str) -> str:  # noqa: WPS125
+        salt = gen_salt(SALT_LENGTH)
+        return f'{self.method}${salt}${self._derive(password, salt, self.n, self.r, self.p)}'
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        method, salt, hashval = password_hash.split('$', 2)
+        _, n, r, p = method.split(':')  # noqa: WPS111
+        derived = self._derive(password, salt, int(n), int(r), int(p))
+        return hmac.compare_digest(derived, hashval)
+
+    def identify(self, password_hash: str) -> bool:
+        return password_hash.startswith(self.prefix)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return password_hash.split('$', 1)[0] != self.method
+
+    @property
+    def method(self) -> str:
+        return f'scrypt:{self.n}:{self.r}:{self.p}'
+
+    def _derive(  # noqa: WPS211
+        self,
+        password: str,
+        salt: str,
+        n: int,  # noqa: WPS111
+        r: int,  # noqa: WPS111
+        p: int,  # noqa: WPS111
+    ) -> str:
+        return hashlib.scrypt(
+            password.encode('utf-8'),
+            salt=salt.encode('utf-8'),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=SCRYPT_MAX_MEMORY,
+        ).hex()
+
+
+class Argon2Scheme(PasswordScheme):
+    name = 'argon2id'
+    cost_name = 'PASSWORD_ARGON2_MEMORY_COST'
+    prefix = '$argon2id$'
+
+    def __init__(self, time_cost: int, memory_cost: int, parallelism: int):
+        # argon2-cffi нужен только тем, кто выбрал argon2id
+        from argon2 import PasswordHasher as Argon2Hasher
+        from argon2 import Type
+
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+        self.hasher = Argon2Hasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            type=Type.ID,
+        )
+
+    @property
+    def cost(self) -> int:
+        return self.memory_cost
+
+    def with_cost(self, cost: int) -> 'Argon2Scheme':
+        return Argon2Scheme(
+            time_cost=self.time_cost,
+            memory_cost=cost,
+            parallelism=self.parallelism,
+        )
+
+    def hash(self, password: str) -> str:  # noqa: WPS125
+        return self.hasher.hash(password)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        from argon2.exceptions import InvalidHash, VerificationError
+
+        try:
+            return self.hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHash):
+            return False
+
+    def identify(self, password_hash: str) -> bool:
+        return password_hash.startswith(self.prefix)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self.hasher.check_needs_rehash(password_hash)
+
+
+def create_scheme(name: str) -> PasswordScheme:
+    if name == PBKDF2Scheme.name:
+        return PBKDF2Scheme(iterations=settings.PASSWORD_PBKDF2_ITERATIONS)
+    if name == ScryptScheme.name:
+        return ScryptScheme(
+            n=settings.PASSWORD_SCRYPT_N,
+            r=settings.PASSWORD_SCRYPT_R,
+            p=settings.PASSWORD_SCRYPT_P,
+        )
+    if name == Argon2Scheme.name:
+        return Argon2Scheme(
+            time_cost=settings.PASSWORD_ARGON2_TIME_COST,
+            memory_cost=settings.PASSWORD_ARGON2_MEMORY_COST,
+            parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+        )
+    raise ValueError(f'Unknown password hash scheme {name}')
+
+
+class PasswordHasher:
+    """
+    Хеширование и проверка паролей в нативных потоках.
+    PBKDF2, scrypt и argon2 отпускают GIL, поэтому в потоке они не останавливают
+    остальные гринлеты воркера, как при вызове прямо из обработчика запроса.
+    Новые хеши создаются текущей схемой, а проверяются той, которой были созданы.
+    """
+
+    def __init__(self, scheme: PasswordScheme, executor: str, workers: int):
+        self.scheme = scheme
+        self.executor_type = executor
+        self.workers = workers
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.schemes: dict[str, PasswordScheme] = {scheme.name: scheme}
+
+    def hash(self, password: str) -> str:  # noqa: WPS125
+        return self.run(self.scheme.hash, password)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self.run(self.get_scheme(password_hash).verify, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        if not self.scheme.identify(password_hash):
+            return True
+        return self.scheme.needs_rehash(password_hash)
+
+    def get_scheme(self, password_hash: str) -> PasswordScheme:
+        for scheme in self.schemes.values():
+            if scheme.identify(password_hash):
+                return scheme
+        for name in (PBKDF2Scheme.name, ScryptScheme.name, Argon2Scheme.name):
+            scheme = create_scheme(name)
+            if scheme.identify(password_hash):
+                self.schemes[name] = scheme
+                return scheme
+        raise ValueError('Unknown password hash format')
+
+    def run(self, func, *args):
+        if self.executor_type == INLINE_EXECUTOR:
+            return func(*args)
+
+        # После monkey.patch_all потоки threading - это гринлеты, нативные есть только у хаба
+        if monkey.is_module_patched('threading'):
+            threadpool = get_hub().threadpool
+            if threadpool.maxsize != self.workers:
+                threadpool.maxsize = self.workers
+            return threadpool.apply(func, args)
+
+        if not self.executor:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix='password-hasher',
+            )
+        return self.executor.submit(func, *args).result()
+
+
+@lru_cache()
+def get_password_hasher() -> PasswordHasher:
+    return PasswordHasher(
+        scheme=create_scheme(settings.PASSWORD_HASH_SCHEME),
+        executor=settings.PASSWORD_HASHER_EXECUTOR,
+        workers=settings.PASSWORD_HASHER_WORKERS,
+    )
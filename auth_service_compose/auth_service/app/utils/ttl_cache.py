@@ -0,0 +1,40 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Ограниченный по размеру LRU-кеш в памяти процесса,
+    записи которого устаревают через ttl секунд.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.items: OrderedDict = OrderedDict()  # noqa: WPS110
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self.items.get(key)
+        if item is None:
+            return None
+
+        expire_at, cache_value = item
+        if expire_at < time.monotonic():
+            self.items.pop(key, None)
+            return None
+
+        self.items.move_to_end(key)
+        return cache_value
+
+    def set(self, key: Hashable, cache_value: Any):
+        self.items[key] = (time.monotonic() + self.ttl, cache_value)
+        self.items.move_to_end(key)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self.items.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self.items)
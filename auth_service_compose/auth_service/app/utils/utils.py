@@ -10,11 +10,12 @@ from http import HTTPStatus
 from os.path import join
 
 from flask import Flask, Response, current_app, json, request
-from flask_jwt_extended import (current_user, get_csrf_token,
+from flask_jwt_extended import (current_user, get_csrf_token, get_jwt,
                                 get_jwt_request_location)
 from flask_restx import Api
 
-from models.models import MethodEnum, User
+from models.models import ActionsEnum, MethodEnum, User
+from services.claims import get_claims_service
 from services.logs_service import get_logs_service
 
 PASSWORD_LEN = 20
@@ -25,10 +26,11 @@ def save_activity(user: User, action=None):
     method = getattr(MethodEnum, request.method.lower())
     log_service = get_logs_service()
 
-    log_service.create_log(
+    # В многострочном INSERT default столбца не подставляется вместо None
+    log_service.save_log(
         user_id=user.id,
         when=datetime.now(),
-        action=action,
+        action=action or ActionsEnum.other,
         device=device,
         method=method,
     )
@@ -101,7 +103,8 @@ def required_role_level(level: int):
     def func_wrapper(func):
         @wraps(func)
         def inner(*args, **kwargs):
-            if any(role.level >= level for role in current_user.roles):
+            # Роль из кеша клеймов, а не из токена: снятая роль перестаёт действовать сразу
+            if get_claims_service().get_claims(user_id=get_jwt()['sub']).role >= level:
                 return func(*args, **kwargs)
             return make_error_response(
                 msg='Role level is not enough',
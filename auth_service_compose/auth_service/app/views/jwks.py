@@ -0,0 +1,21 @@
+from core.settings import settings
+from extensions import jwks
+from extensions.tracer import trace_decorator
+from flask import Blueprint, jsonify, request
+from werkzeug.exceptions import NotFound
+
+jwks_view = Blueprint('jwks', __name__)
+
+
+@jwks_view.route('/.well-known/jwks.json', methods=['GET'])
+@trace_decorator()
+def jwks_json():
+    # С симметричной подписью публиковать нечего
+    if not jwks.key_ring:
+        raise NotFound()
+
+    response = jsonify(jwks.key_ring.get_jwks())
+    response.cache_control.public = True
+    response.cache_control.max_age = settings.JWKS_MAX_AGE
+    response.add_etag()
+    return response.make_conditional(request)
@@ -1,9 +1,11 @@
+from core.settings import settings
 from extensions.tracer import trace_decorator
 from flask import Blueprint, make_response, redirect, render_template
 from flask_jwt_extended import jwt_required
 from forms.login_form import LoginForm
 from models.models import ActionsEnum
 from services.jwt import get_jwt_service
+from services.login_guard import get_client_ip, get_login_guard_service
 from services.user import get_user_service
 from utils.utils import handle_csrf, log_activity, save_activity
 
@@ -15,13 +17,29 @@ login_view = Blueprint('login', __name__, template_folder='templates')
 @log_activity()
 @handle_csrf()
 @trace_decorator()
-def login():
+def login():  # noqa: WPS210, WPS231
     form = LoginForm()
     if form.validate_on_submit():
         jwt_service = get_jwt_service()
         user_service = get_user_service()
-        user = user_service.filter_by(login=form.login.data, _first=True)
-        if user and user.check_password(form.password.data):
+        login_guard_service = get_login_guard_service()
+        ip = get_client_ip()
+
+        if settings.ENABLE_LOGIN_GUARD and login_guard_service.get_retry_after(
+            login=form.login.data, ip=ip,
+        ):
+            return render_template(
+                template_name_or_list='login.html',
+                message='Слишком много попыток входа, попробуйте позже',
+                form=form,
+                title='Авторизация',
+                oauth_google_login_url='/oauth2/google/login',
+            )
+
+        user = user_service.get_by_login(login=form.login.data)
+        if user and user_service.check_password(user=user, password=form.password.data):
+            if settings.ENABLE_LOGIN_GUARD:
+                login_guard_service.reset(login=form.login.data)
             response = make_response(redirect('/happy'))
 
             response = jwt_service.authorize(response=response, user=user)
@@ -29,6 +47,9 @@ def login():
             save_activity(user, action=ActionsEnum.login)
             return response
 
+        if settings.ENABLE_LOGIN_GUARD:
+            login_guard_service.register_failure(login=form.login.data, ip=ip)
+
         if not user.email_is_confirmed:
             return render_template(
                 template_name_or_list='login.html',
@@ -5,6 +5,7 @@ from services import oauth_client
 from services.jwt import get_jwt_service
 from services.oauth import get_oauth_service
 from services.user import get_user_service
+from utils.exceptions import UserAlreadyExistsError
 from utils.utils import generate_password, save_activity
 
 oauth_view = Blueprint('oauth', __name__, template_folder='templates')
@@ -26,16 +27,14 @@ def oauth_register(provider):  # noqa: WPS210
     user_service = get_user_service()
     oauth_service = get_oauth_service()
 
-    if user_service.filter_by(login=login, _first=True):
-        return make_response(redirect('/login'))
-    if user_service.filter_by(email=email, _first=True):
-        return make_response(redirect('/login'))
-
     password = generate_password()
-    user = user_service.create_user(user_params={'login': login,
-                                                 'email': email,
-                                                 'password': password,
-                                                 'email_is_confirmed': True})
+    try:
+        user = user_service.create_user(user_params={'login': login,
+                                                     'email': email,
+                                                     'password': password,
+                                                     'email_is_confirmed': True})
+    except UserAlreadyExistsError:
+        return make_response(redirect('/login'))
     user_service.generate_password_event(user_id=user.id)
     oauth_service.create_oauth(oauth_params={
         'user_id': user.id,
@@ -1,10 +1,14 @@
+from core.settings import settings
 from extensions.tracer import trace_decorator
 from flask import Blueprint, make_response, redirect, render_template
 from forms.register_form import RegisterForm
 from services.user import get_user_service
+from utils.exceptions import UserAlreadyExistsError
 
 register_view = Blueprint('register', __name__, template_folder='templates')
 
+AVAILABILITY_URL = f'/{settings.API_URL.strip("/")}/v1/availability'
+
 
 @register_view.route('/register', methods=['GET', 'POST'])
 @trace_decorator()
@@ -18,22 +22,20 @@ def register():
                 form=form,
                 message='Пароли не совпадают',
                 oauth_google_register_url='/oauth2/google/register',
+                availability_url=AVAILABILITY_URL,
             )
         user_service = get_user_service()
-        if user_service.filter_by(  # noqa: WPS337
-                email=form.email.data,
-                _first=True,
-        ) or user_service.filter_by(
-            login=form.login.data, _first=True,
-        ):
+        try:
+            user = user_service.create_user(form.data | {'email_is_confirmed': False})
+        except UserAlreadyExistsError:
             return render_template(
                 template_name_or_list='register.html',
                 title='Регистрация',
                 form=form,
                 message='Такой пользователь уже есть',
                 oauth_google_register_url='/oauth2/google/register',
+                availability_url=AVAILABILITY_URL,
             )
-        user = user_service.create_user(form.data | {'email_is_confirmed': False})
         user_service.confirm_email_event(user_id=user.id)
         return make_response(redirect('/login'))
 
@@ -42,4 +44,5 @@ def register():
         title='Регистрация',
         form=form,
         oauth_google_register_url='/oauth2/google/register',
+        availability_url=AVAILABILITY_URL,
     )
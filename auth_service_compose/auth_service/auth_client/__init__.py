@@ -0,0 +1,12 @@
+from auth_client.keys import JWKSKeySource, KeyNotFoundError, StaticKeySource
+from auth_client.revocation import RevocationCache
+from auth_client.verifier import TokenRevokedError, TokenVerifier
+
+__all__ = [
+    'JWKSKeySource',
+    'KeyNotFoundError',
+    'StaticKeySource',
+    'RevocationCache',
+    'TokenRevokedError',
+    'TokenVerifier',
+]
@@ -0,0 +1,85 @@
+"""
+Микробенчмарк локальной проверки токенов на одном ядре:
+
+    python -m auth_client.benchmark --seconds 3
+"""
+import argparse
+import time
+import uuid
+
+import jwt
+from auth_client.keys import StaticKeySource
+from auth_client.revocation import RevocationCache
+from auth_client.verifier import TokenVerifier
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+RSA_KEY_SIZE = 2048
+RSA_PUBLIC_EXPONENT = 65537
+HMAC_SECRET = uuid.uuid4().hex * 2
+REVOKED_TOKENS = 100_000
+
+
+def generate_keys() -> dict:
+    rsa_key = rsa.generate_private_key(public_exponent=RSA_PUBLIC_EXPONENT, key_size=RSA_KEY_SIZE)
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    return {
+        'HS256': (HMAC_SECRET, HMAC_SECRET),
+        'RS256': (rsa_key, rsa_key.public_key()),
+        'ES256': (ec_key, ec_key.public_key()),
+    }
+
+
+def make_token(algorithm: str, private_key) -> str:
+    now = int(time.time())
+    return jwt.encode(
+        {
+            'sub': str(uuid.uuid4()),
+            'jti': str(uuid.uuid4()),
+            'iat': now,
+            'exp': now + 3600,
+            'type': 'access',
+            'role': 0,
+        },
+        key=private_key,
+        algorithm=algorithm,
+    )
+
+
+def make_revocation() -> RevocationCache:
+    # Копия списка отзыва уже загружена: Redis в замере не участвует
+    revocation = RevocationCache(redis=None)
+    revocation.jtis = {str(uuid.uuid4()) for _ in range(REVOKED_TOKENS)}
+    revocation.is_ready = True
+    return revocation
+
+
+def measure(verifier: TokenVerifier, token: str, seconds: float) -> float:
+    verifications = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        verifier.verify(token)
+        verifications += 1
+    return verifications / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    revocation = make_revocation()
+    for algorithm, (private_key, public_key) in generate_keys().items():
+        token = make_token(algorithm, private_key)
+        for name, cache in (('signature', None), ('signature+revocation', revocation)):
+            verifier = TokenVerifier(
+                key_source=StaticKeySource(public_key),
+                algorithms=[algorithm],
+                revocation=cache,
+            )
+            rate = measure(verifier, token, args.seconds)
+            print(f'{algorithm} {name}: {rate:.0f} verifications/s')  # noqa: WPS421
+
+
+if __name__ == '__main__':
+    main()
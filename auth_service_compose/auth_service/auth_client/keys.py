@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+import requests
+from jwt import PyJWK
+from jwt.exceptions import InvalidTokenError, PyJWKError
+
+logger = logging.getLogger(__name__)
+
+REFRESH_ERRORS = (requests.RequestException, PyJWKError, KeyError, ValueError)
+
+
+class KeyNotFoundError(InvalidTokenError):
+    pass  # noqa: WPS420, WPS604
+
+
+class StaticKeySource:
+    """Один ключ без kid: общий секрет HS256 или публичный ключ."""
+
+    def __init__(self, key: Any):
+        self.key = key
+
+    def get_key(self, kid: Optional[str]) -> Any:
+        return self.key
+
+
+class JWKSKeySource:
+    """
+    Публичные ключи из /.well-known/jwks.json сервиса авторизации.
+    Ключи обновляются в фоне раз в refresh_interval секунд; неизвестный kid
+    (ключ только что ротировали) вызывает внеочередное обновление, но не чаще
+    чем раз в min_refresh_interval секунд.
+    """
+
+    def __init__(
+            self,
+            url: str,
+            refresh_interval: float = 300,
+            min_refresh_interval: float = 10,
+            timeout: float = 5,
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+
+        self.keys: dict[str, Any] = {}
+        self.etag: Optional[str] = None
+        self.refreshed_at = 0.0
+        self.lock = threading.Lock()
+        self.refresher: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.refresher:
+            return
+        self.refresh()
+        self.refresher = threading.Thread(target=self.follow, name='jwks-refresher', daemon=True)
+        self.refresher.start()
+
+    def follow(self):
+        while True:  # noqa: WPS457
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except REFRESH_ERRORS as error:
+                # Продолжаем работать со старыми ключами
+                logger.warning('Failed to refresh JWKS: %s', error)
+
+    def refresh(self):
+        with self.lock:
+            self.refreshed_at = time.monotonic()
+            headers = {'If-None-Match': self.etag} if self.etag else {}
+            response = requests.get(self.url, headers=headers, timeout=self.timeout)
+            if response.status_code == requests.codes.not_modified:
+                return
+            response.raise_for_status()
+
+            self.keys = {
+                jwk['kid']: PyJWK(jwk).key
+                for jwk in response.json()['keys']
+            }
+            self.etag = response.headers.get('ETag')
+
+    def get_key(self, kid: Optional[str]) -> Any:
+        # Токены без kid подписаны до ротации, когда ключ был один
+        if kid is None and len(self.keys) == 1:
+            return next(iter(self.keys.values()))
+
+        key = self.keys.get(kid)
+        if key is not None:
+            return key
+
+        if time.monotonic() - self.refreshed_at >= self.min_refresh_interval:
+            # Недоступный JWKS - такой же отказ в проверке токена, а не падение клиента
+            try:
+                self.refresh()
+            except REFRESH_ERRORS as error:
+                raise KeyNotFoundError(f'Failed to refresh JWKS: {error}') from error
+            key = self.keys.get(kid)
+        if key is None:
+            raise KeyNotFoundError(f'Unknown signing key {kid}')
+        return key
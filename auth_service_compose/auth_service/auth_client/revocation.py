@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from redis import Redis  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationCache:
+    """
+    Локальная копия списка отзыва сервиса авторизации.
+    Наполняется из того же потока Redis, в который пишет JWTService.block_tokens,
+    поэтому проверка токена не ходит в сеть. Пока копия не догнала поток
+    (или потеряла связь с Redis), токен проверяется напрямую в Redis.
+    Ключи и их формат должны совпадать с настройками сервиса авторизации.
+    """
+
+    def __init__(  # noqa: WPS211
+            self,
+            redis: Redis,
+            stream: str = 'revoked_tokens',
+            blocklist_key_prefix: str = 'blocklist',
+            epoch_key_prefix: str = 'revoked_before',
+            bucket_seconds: int = 3600,
+            reload_interval: float = 3600,
+            read_batch_size: int = 1000,
+            block_in_milliseconds: int = 5000,
+            retry_in_seconds: float = 1,
+    ):
+        self.redis = redis
+        self.stream = stream
+        self.blocklist_key_prefix = blocklist_key_prefix
+        self.epoch_key_prefix = epoch_key_prefix
+        self.bucket_seconds = bucket_seconds
+        self.reload_interval = reload_interval
+        self.read_batch_size = read_batch_size
+        self.block_in_milliseconds = block_in_milliseconds
+        self.retry_in_seconds = retry_in_seconds
+
+        self.jtis: set[str] = set()
+        self.epochs: dict[str, int] = {}
+        self.last_id = '0'
+        self.is_ready = False
+        self.follower: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.follower:
+            return
+        self.follower = threading.Thread(target=self.follow, name='revocation-cache', daemon=True)
+        self.follower.start()
+
+    def follow(self):
+        while True:  # noqa: WPS457
+            try:
+                # Поток обрезается по времени жизни refresh токена, а локальное
+                # множество нет: периодически собираем его заново
+                self.load()
+                self.is_ready = True
+                loaded_at = time.monotonic()
+                while time.monotonic() - loaded_at < self.reload_interval:
+                    response = self.redis.xread(
+                        streams={self.stream: self.last_id},
+                        count=self.read_batch_size,
+                        block=self.block_in_milliseconds,
+                    )
+                    if response:
+                        self.consume(self.jtis, self.epochs, response[0][1])
+            except Exception as error:
+                # Битая запись в потоке не должна остановить поток чтения:
+                # пока копия не собрана заново, проверяем напрямую в Redis
+                logger.warning('Revocation cache lost the stream: %s', error)
+                self.is_ready = False
+                time.sleep(self.retry_in_seconds)
+
+    def load(self):
+        jtis = self.read_blocklist()
+        epochs: dict[str, int] = {}
+        self.last_id = '0'
+        while True:  # noqa: WPS457
+            entries = self.redis.xrange(
+                name=self.stream,
+                min=f'({self.last_id}',
+                count=self.read_batch_size,
+            )
+            self.consume(jtis, epochs, entries)
+            if len(entries) < self.read_batch_size:
+                break
+        self.jtis = jtis
+        self.epochs = epochs
+
+    def read_blocklist(self) -> set[str]:
+        # Отозванное до появления потока есть только в множествах списка
+        jtis: set[str] = set()
+        match = f'{self.blocklist_key_prefix}:*'
+        for key in self.redis.scan_iter(match=match, count=self.read_batch_size):
+            for jti in self.redis.sscan_iter(key, count=self.read_batch_size):
+                jtis.add(jti.decode('utf-8'))
+        return jtis
+
+    def consume(self, jtis: set[str], epochs: dict[str, int], entries: list):
+        for entry_id, fields in entries:
+            if b'jti' in fields:
+                jtis.add(fields[b'jti'].decode('utf-8'))
+            else:
+                user_id = fields[b'user_id'].decode('utf-8')
+                epochs[user_id] = max(int(fields[b'epoch']), epochs.get(user_id, 0))
+            self.last_id = entry_id.decode('utf-8')
+
+    def is_revoked(self, jwt_payload: dict) -> bool:
+        if not self.is_ready:
+            return self.is_revoked_in_redis(jwt_payload)
+
+        epoch = self.epochs.get(jwt_payload['sub'])
+        return jwt_payload['jti'] in self.jtis or (
+            epoch is not None and jwt_payload['iat'] < epoch
+        )
+
+    def is_revoked_in_redis(self, jwt_payload: dict) -> bool:
+        pipeline = self.redis.pipeline()
+        pipeline.sismember(
+            f'{self.blocklist_key_prefix}:{jwt_payload["exp"] // self.bucket_seconds}',
+            jwt_payload['jti'],
+        )
+        pipeline.get(f'{self.epoch_key_prefix}:{jwt_payload["sub"]}')
+        is_blocked, epoch = pipeline.execute()
+        return bool(is_blocked) or (epoch is not None and jwt_payload['iat'] < int(epoch))
@@ -0,0 +1,48 @@
+from typing import Optional, Sequence, Union
+
+import jwt
+from auth_client.keys import JWKSKeySource, StaticKeySource
+from auth_client.revocation import RevocationCache
+
+REQUIRED_CLAIMS = ('exp', 'iat', 'sub', 'jti')
+
+
+class TokenRevokedError(jwt.InvalidTokenError):
+    pass  # noqa: WPS420, WPS604
+
+
+class TokenVerifier:
+    """
+    Проверка access токенов сервиса авторизации без обращения к нему:
+    подпись и срок проверяются локально, отзыв - по RevocationCache.
+    """
+
+    def __init__(
+            self,
+            key_source: Union[JWKSKeySource, StaticKeySource],
+            algorithms: Sequence[str],
+            revocation: Optional[RevocationCache] = None,
+            token_type: Optional[str] = 'access',
+            leeway: float = 0,
+    ):
+        self.key_source = key_source
+        self.algorithms = list(algorithms)
+        self.revocation = revocation
+        self.token_type = token_type
+        self.leeway = leeway
+
+    def verify(self, token: str) -> dict:
+        header = jwt.get_unverified_header(token)
+        jwt_payload = jwt.decode(
+            token,
+            key=self.key_source.get_key(header.get('kid')),
+            algorithms=self.algorithms,
+            leeway=self.leeway,
+            options={'require': list(REQUIRED_CLAIMS)},
+        )
+
+        if self.token_type and jwt_payload.get('type') != self.token_type:
+            raise jwt.InvalidTokenError(f'Only {self.token_type} tokens are allowed')
+        if self.revocation and self.revocation.is_revoked(jwt_payload):
+            raise TokenRevokedError('Token has been revoked')
+        return jwt_payload
@@ -1,4 +1,5 @@
 import builtins
+import uuid
 from dataclasses import dataclass
 from typing import Optional
 
@@ -64,7 +65,8 @@ def make_request(session):
             json: Optional[dict] = None,
     ) -> HTTPResponse:
         params = params or {}
-        headers = headers or {}
+        # Без X-Request-Id сервис отвечает 400 на любой запрос
+        headers = {'X-Request-Id': str(uuid.uuid4())} | (headers or {})
         json = json or {}
 
         url = f'{settings.API_URL}/api/v1{method}'
@@ -73,7 +75,8 @@ def make_request(session):
 
         async with func(url, params=params, headers=headers, json=json) as response:
             return HTTPResponse(
-                body=await response.json(),
+                # У ответов 204 нет тела и типа application/json
+                body=await response.json(content_type=None),
                 headers=response.headers,
                 status=response.status,
             )
@@ -147,10 +147,10 @@ def prepare_tables(prepare_for_test):
                          'users': 'users.json',
                          'user_roles': 'user_roles.json',
                          }
-        for key, value in table_to_file:
+        for key, value in table_to_file.items():
             await prepare_for_test(table_name=key, filename=value)
 
-        return inner
+    return inner
 
 
 @pytest.fixture
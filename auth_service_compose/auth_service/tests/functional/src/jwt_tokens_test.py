@@ -0,0 +1,134 @@
+import asyncio
+from http import HTTPStatus
+
+import aioredis
+import pytest
+from psycopg2.extensions import connection as _connection
+
+pytestmark = pytest.mark.asyncio
+
+USER_ID = 'ed5b50a1-2f79-43e9-918d-87140bb9afd9'
+PASSWORD = 'hirnim-fogkuj-pUrhi4'
+
+
+@pytest.mark.parametrize(
+    'login',
+    (
+            'user',
+            'USER',
+            'User',
+    ),
+)
+async def test_login_is_case_insensitive(
+        postgres_connection: _connection,
+        redis_client: aioredis.Redis,
+        prepare_tables,
+        make_request,
+        delete_tables,
+
+        login: str,
+):
+    await prepare_tables()
+
+    # Выполнение запроса
+    response = await make_request(
+        method='/login',
+        http_method='POST',
+        json={'login': login, 'password': PASSWORD},
+    )
+
+    # Проверка результата
+    assert response.status == HTTPStatus.OK
+    assert response.body['access_token']
+
+    await delete_tables()
+
+
+async def test_logout_everywhere_revokes_issued_tokens(
+        postgres_connection: _connection,
+        redis_client: aioredis.Redis,
+        prepare_tables,
+        make_request,
+        delete_tables,
+):
+    await prepare_tables()
+    credentials = {'login': 'user', 'password': PASSWORD}
+    tokens = (await make_request(method='/login', http_method='POST', json=credentials)).body
+
+    # Выполнение запроса
+    response = await make_request(
+        method='/logout_everywhere',
+        http_method='POST',
+        json={'password': PASSWORD},
+        headers={'Authorization': f'Bearer {tokens["access_token"]}'},
+    )
+
+    # Проверка результата
+    assert response.status == HTTPStatus.NO_CONTENT
+
+    # Старые access и refresh токены отозваны одной записью эпохи
+    response = await make_request(
+        method=f'/users/{USER_ID}',
+        http_method='GET',
+        headers={'Authorization': f'Bearer {tokens["access_token"]}'},
+    )
+    assert response.status == HTTPStatus.UNAUTHORIZED
+
+    response = await make_request(
+        method='/refresh',
+        http_method='POST',
+        headers={'Authorization': f'Bearer {tokens["refresh_token"]}'},
+    )
+    assert response.status == HTTPStatus.UNAUTHORIZED
+
+    # Новый вход, даже в ту же секунду, эпохой не отзывается
+    new_tokens = (await make_request(method='/login', http_method='POST', json=credentials)).body
+    response = await make_request(
+        method=f'/users/{USER_ID}',
+        http_method='GET',
+        headers={'Authorization': f'Bearer {new_tokens["access_token"]}'},
+    )
+    assert response.status == HTTPStatus.OK
+
+    await delete_tables()
+
+
+async def test_revocation_is_checked_once_per_request(
+        postgres_connection: _connection,
+        redis_client: aioredis.Redis,
+        prepare_tables,
+        make_request,
+        delete_tables,
+):
+    await prepare_tables()
+    tokens = (await make_request(
+        method='/login',
+        http_method='POST',
+        json={'login': 'user', 'password': PASSWORD},
+    )).body
+    headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+    await make_request(
+        method='/logout',
+        http_method='POST',
+        json={'refresh_token': tokens['refresh_token']},
+        headers=headers,
+    )
+    # Даём воркерам дочитать отзыв из потока в свои фильтры
+    await asyncio.sleep(1)
+    await redis_client.config_resetstat()
+
+    # Выполнение запроса
+    response = await make_request(
+        method=f'/users/{USER_ID}',
+        http_method='GET',
+        headers=headers,
+    )
+
+    # Проверка результата: token_in_blocklist_loader взял ответ пайплайна pre_dispatch,
+    # а не проверил токен в Redis второй раз
+    assert response.status == HTTPStatus.UNAUTHORIZED
+
+    commandstats = (await redis_client.info('commandstats'))['commandstats']
+    assert commandstats['cmdstat_sismember']['calls'] == '1'
+
+    await delete_tables()
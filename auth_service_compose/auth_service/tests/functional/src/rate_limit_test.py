@@ -0,0 +1,84 @@
+import uuid
+from http import HTTPStatus
+
+import aiohttp
+import pytest
+from settings import settings
+
+pytestmark = pytest.mark.asyncio
+
+LOGIN_LIMIT = 10
+REGISTER_LIMIT = 5
+
+
+@pytest.mark.parametrize(
+    'client_ip, other_ip',
+    (
+            ('10.0.0.1', '10.0.0.2'),
+    ),
+)
+async def test_login_is_limited_per_ip(
+        flush_redis,
+        make_request,
+
+        client_ip: str,
+        other_ip: str,
+):
+    await flush_redis()
+
+    # Разные логины, чтобы сработал лимитер, а не блокировка входа по логину
+    statuses = []
+    for attempt in range(LOGIN_LIMIT + 1):
+        response = await make_request(
+            method='/login',
+            http_method='POST',
+            json={'login': f'nobody{attempt}', 'password': 'wrong'},
+            headers={'X-Real-IP': client_ip},
+        )
+        statuses.append(response.status)
+
+    # Проверка результата
+    assert HTTPStatus.TOO_MANY_REQUESTS not in statuses[:-1]
+    assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response.headers['Retry-After']) > 0
+
+    # Счётчик у каждого клиента свой, а не общий на адрес nginx
+    response = await make_request(
+        method='/login',
+        http_method='POST',
+        json={'login': 'nobody', 'password': 'wrong'},
+        headers={'X-Real-IP': other_ip},
+    )
+    assert response.status != HTTPStatus.TOO_MANY_REQUESTS
+
+
+@pytest.mark.parametrize(
+    'client_ip, other_ip',
+    (
+            ('10.0.1.1', '10.0.1.2'),
+    ),
+)
+async def test_register_is_limited_per_ip(
+        session: aiohttp.ClientSession,
+        flush_redis,
+
+        client_ip: str,
+        other_ip: str,
+):
+    await flush_redis()
+
+    async def register(ip: str) -> int:
+        # Форма пустая: до обработчика дело доходит, но пользователь не создаётся
+        async with session.post(
+            f'{settings.API_URL}/register',
+            data={},
+            headers={'X-Request-Id': str(uuid.uuid4()), 'X-Real-IP': ip},
+        ) as response:
+            return response.status
+
+    statuses = [await register(client_ip) for _ in range(REGISTER_LIMIT + 1)]
+
+    # Проверка результата
+    assert HTTPStatus.TOO_MANY_REQUESTS not in statuses[:-1]
+    assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS
+    assert await register(other_ip) != HTTPStatus.TOO_MANY_REQUESTS
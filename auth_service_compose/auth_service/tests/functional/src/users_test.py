@@ -128,3 +128,43 @@ async def test_get_user(
         assert response.body == expected
 
     await delete_tables()
+
+
+@pytest.mark.parametrize(
+    'json_data, http_method',
+    (
+            (
+                    {'email': 'new_email@example.com', 'login': 'USER', 'password': 'user'},
+                    'POST',
+            ),
+            (
+                    {'email': 'User@Example.com', 'login': 'new_user', 'password': 'user'},
+                    'POST',
+            ),
+    ),
+)
+async def test_create_user_conflict(
+        postgres_connection: _connection,
+        redis_client: aioredis.Redis,
+        get_access_token_headers,
+        make_request,
+        delete_tables,
+
+        json_data: dict,
+        http_method: str,
+):
+    headers = await get_access_token_headers()
+
+    # Выполнение запроса: логин или почта заняты с точностью до регистра
+    response = await make_request(
+        method='/users',
+        http_method=http_method,
+        json=json_data,
+        headers=headers,
+    )
+
+    # Проверка результата
+    assert response.status == HTTPStatus.BAD_REQUEST
+    assert response.body['message'] == 'User already exist'
+
+    await delete_tables()
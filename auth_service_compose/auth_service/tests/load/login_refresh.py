@@ -0,0 +1,142 @@
+"""
+Нагрузочный тест: задержка обновления токена при одновременных логинах.
+
+Сначала замеряются только /refresh, затем те же /refresh на фоне потока /login.
+Пока хеширование паролей блокировало воркер, p99 refresh во второй фазе
+вырастал до времени вычисления хеша.
+
+Лимитер нужно выключить (ENABLE_LIMITER=False): иначе почти все логины и
+часть refresh получат быстрый 429. Ответы не 2xx считаются отдельно и в
+задержки не попадают.
+
+    pip install -r requirements.txt
+    python login_refresh.py --url http://localhost --login user --password secret
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import Counter
+from http import HTTPStatus
+
+import aiohttp
+
+PERCENTILES = 100
+
+
+def percentile(latencies: list[float], rank: int) -> float:
+    return statistics.quantiles(latencies, n=PERCENTILES)[rank - 1] * 1000
+
+
+async def login(session: aiohttp.ClientSession, url: str, credentials: dict) -> dict:
+    async with session.post(
+        f'{url}/api/v1/login',
+        json=credentials,
+        headers={'X-Request-Id': str(uuid.uuid4())},
+    ) as response:
+        assert response.status == HTTPStatus.OK, await response.text()  # noqa: S101
+        return await response.json()
+
+
+def is_success(status: int) -> bool:
+    return HTTPStatus.OK <= status < HTTPStatus.MULTIPLE_CHOICES
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.failures: Counter = Counter()
+
+    def report(self, title: str):
+        summary = title
+        # Для квантилей нужно хотя бы два замера
+        if len(self.latencies) > 1:
+            summary += (
+                f' p50 {percentile(self.latencies, 50):.1f}ms'
+                f' p99 {percentile(self.latencies, 99):.1f}ms'
+            )
+        summary += f' ({len(self.latencies)} ok'
+        if self.failures:
+            summary += ', failed: ' + ', '.join(
+                f'{status} x{count}' for status, count in sorted(self.failures.items())
+            )
+        print(f'{summary})')  # noqa: WPS421
+
+
+async def timed_post(session, url: str, stats: Stats, **kwargs):
+    # Быстрый отказ (429 лимитера, 400) не должен занижать задержки
+    started = time.perf_counter()
+    async with session.post(url, **kwargs) as response:
+        await response.read()
+    if is_success(response.status):
+        stats.latencies.append(time.perf_counter() - started)
+    else:
+        stats.failures[response.status] += 1
+
+
+async def refresh_loop(session, url: str, refresh_token: str, deadline: float, stats: Stats):
+    while time.perf_counter() < deadline:
+        await timed_post(
+            session,
+            f'{url}/api/v1/refresh',
+            stats,
+            headers={
+                'Authorization': f'Bearer {refresh_token}',
+                'X-Request-Id': str(uuid.uuid4()),
+            },
+        )
+
+
+async def login_loop(session, url: str, credentials: dict, deadline: float, stats: Stats):
+    while time.perf_counter() < deadline:
+        await timed_post(
+            session,
+            f'{url}/api/v1/login',
+            stats,
+            json=credentials,
+            headers={'X-Request-Id': str(uuid.uuid4())},
+        )
+
+
+async def run_phase(args, credentials: dict, refresh_token: str, with_logins: bool):
+    refresh_stats = Stats()
+    login_stats = Stats()
+    deadline = time.perf_counter() + args.duration
+
+    async with aiohttp.ClientSession() as session:
+        tasks = [
+            refresh_loop(session, args.url, refresh_token, deadline, refresh_stats)
+            for _ in range(args.refresh_concurrency)
+        ]
+        if with_logins:
+            tasks += [
+                login_loop(session, args.url, credentials, deadline, login_stats)
+                for _ in range(args.login_concurrency)
+            ]
+        await asyncio.gather(*tasks)
+
+    title = 'refresh + login' if with_logins else 'refresh only'
+    refresh_stats.report(f'{title}: refresh')
+    if with_logins:
+        login_stats.report(f'{title}: login')
+
+
+async def main(args):
+    credentials = {'login': args.login, 'password': args.password}
+    async with aiohttp.ClientSession() as session:
+        tokens = await login(session, args.url, credentials)
+
+    await run_phase(args, credentials, tokens['refresh_token'], with_logins=False)
+    await run_phase(args, credentials, tokens['refresh_token'], with_logins=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default='http://localhost')
+    parser.add_argument('--login', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--refresh-concurrency', type=int, default=10)
+    parser.add_argument('--login-concurrency', type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import fakeredis
+import pytest
+from dotenv import load_dotenv
+
+SERVICE_DIR = Path(__file__).resolve().parents[2]
+APP_DIR = SERVICE_DIR / 'app'
+
+# Модули приложения импортируются от корня app, а настройки требуют окружения.
+# auth_client - отдельный пакет рядом с app
+sys.path.insert(0, str(APP_DIR))
+sys.path.append(str(SERVICE_DIR))
+load_dotenv(APP_DIR / '.env.sample')
+
+from db import cache_db  # noqa: E402
+from models import models  # noqa: E402
+from services.base_cache import BaseRedisStorage  # noqa: E402
+from services.jwt import JWTService  # noqa: E402
+from services.revocation_filter import (RevocationFilterService,  # noqa: E402
+                                        get_revocation_filter)
+
+
+@pytest.fixture
+def redis_client() -> fakeredis.FakeRedis:
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def cache(redis_client: fakeredis.FakeRedis, monkeypatch) -> BaseRedisStorage:
+    storage = BaseRedisStorage(redis=redis_client)
+    monkeypatch.setattr(cache_db, 'cache', storage)
+    return storage
+
+
+@pytest.fixture
+def revocation_filter(cache: BaseRedisStorage) -> RevocationFilterService:
+    # Фабрика кеширует сервис вместе с хранилищем: каждому тесту - свой
+    get_revocation_filter.cache_clear()
+    yield get_revocation_filter()
+    get_revocation_filter.cache_clear()
+
+
+@pytest.fixture
+def jwt_service(cache: BaseRedisStorage, revocation_filter: RevocationFilterService) -> JWTService:
+    # Postgres в модульных тестах не нужен: проверяется только работа со списком в Redis
+    return JWTService(cache=cache, db=None, db_model=models.RefreshToken)
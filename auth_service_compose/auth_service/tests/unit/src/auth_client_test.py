@@ -0,0 +1,156 @@
+import time
+import uuid
+
+import jwt
+import pytest
+from auth_client import (RevocationCache, StaticKeySource, TokenRevokedError,
+                         TokenVerifier)
+from fakeredis import FakeRedis
+
+SECRET = uuid.uuid4().hex * 2
+BUCKET = 3600
+
+
+def make_payload(**claims) -> dict:
+    now = int(time.time())
+    jwt_payload = {
+        'sub': str(uuid.uuid4()),
+        'jti': str(uuid.uuid4()),
+        'iat': now,
+        'exp': now + 300,
+        'type': 'access',
+    }
+    jwt_payload.update(claims)
+    return jwt_payload
+
+
+def encode(jwt_payload: dict, key: str = SECRET) -> str:
+    return jwt.encode(jwt_payload, key, algorithm='HS256')
+
+
+@pytest.fixture
+def revocation(redis_client: FakeRedis) -> RevocationCache:
+    return RevocationCache(redis=redis_client, bucket_seconds=BUCKET)
+
+
+@pytest.fixture
+def verifier(revocation: RevocationCache) -> TokenVerifier:
+    return TokenVerifier(
+        key_source=StaticKeySource(SECRET),
+        algorithms=['HS256'],
+        revocation=revocation,
+    )
+
+
+def block(redis_client: FakeRedis, jwt_payload: dict):
+    # Так же, как JWTService.block_tokens: множество по часу истечения и запись в поток
+    redis_client.sadd(f'blocklist:{jwt_payload["exp"] // BUCKET}', jwt_payload['jti'])
+    redis_client.xadd('revoked_tokens', {'jti': jwt_payload['jti']})
+
+
+def test_verify_returns_claims(verifier: TokenVerifier):
+    jwt_payload = make_payload()
+
+    # Проверка результата
+    assert verifier.verify(encode(jwt_payload)) == jwt_payload
+
+
+@pytest.mark.parametrize(
+    'token',
+    (
+            # Чужая подпись
+            encode(make_payload(), key=uuid.uuid4().hex * 2),
+            # Истёк
+            encode(make_payload(exp=int(time.time()) - 10)),
+            # refresh вместо access
+            encode(make_payload(type='refresh')),
+            # Без обязательного jti
+            encode({key: claim for key, claim in make_payload().items() if key != 'jti'}),
+            'not-a-token',
+    ),
+)
+def test_verify_rejects_invalid_tokens(verifier: TokenVerifier, token: str):
+    # Проверка результата
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(token)
+
+
+@pytest.mark.parametrize('is_ready', (False, True))
+def test_verify_rejects_revoked_token(
+        redis_client: FakeRedis,
+        revocation: RevocationCache,
+        verifier: TokenVerifier,
+
+        is_ready: bool,
+):
+    jwt_payload = make_payload()
+    block(redis_client, jwt_payload)
+    if is_ready:
+        revocation.load()
+        revocation.is_ready = True
+
+    # Проверка результата
+    with pytest.raises(TokenRevokedError):
+        verifier.verify(encode(jwt_payload))
+    assert verifier.verify(encode(make_payload()))
+
+
+def test_is_revoked_in_redis_until_ready(redis_client: FakeRedis, revocation: RevocationCache):
+    revoked, other_bucket = make_payload(), make_payload()
+    block(redis_client, revoked)
+    other_bucket['jti'], other_bucket['exp'] = revoked['jti'], revoked['exp'] + BUCKET
+
+    # Проверка результата: до загрузки копии ответ берётся из множества часа exp
+    assert revocation.is_revoked(revoked)
+    assert not revocation.is_revoked(other_bucket)
+
+
+@pytest.mark.parametrize('is_ready', (False, True))
+def test_is_revoked_by_user_epoch(
+        redis_client: FakeRedis,
+        revocation: RevocationCache,
+
+        is_ready: bool,
+):
+    user_id, epoch = str(uuid.uuid4()), int(time.time())
+    redis_client.set(f'revoked_before:{user_id}', epoch)
+    redis_client.xadd('revoked_tokens', {'user_id': user_id, 'epoch': epoch})
+    if is_ready:
+        revocation.load()
+        revocation.is_ready = True
+
+    # Проверка результата: отозваны только токены, выпущенные раньше эпохи
+    assert revocation.is_revoked(make_payload(sub=user_id, iat=epoch - 1))
+    assert not revocation.is_revoked(make_payload(sub=user_id, iat=epoch))
+
+
+def test_load_reads_blocklist_revoked_before_stream(
+        redis_client: FakeRedis,
+        revocation: RevocationCache,
+):
+    # Токен отозван до появления потока: он есть только в множестве списка
+    jwt_payload = make_payload()
+    redis_client.sadd(f'blocklist:{jwt_payload["exp"] // BUCKET}', jwt_payload['jti'])
+
+    revocation.load()
+    revocation.is_ready = True
+
+    # Проверка результата
+    assert revocation.is_revoked(jwt_payload)
+    assert not revocation.is_revoked(make_payload())
+
+
+def test_consume_follows_stream(revocation: RevocationCache):
+    revocation.load()
+    revocation.is_ready = True
+    jwt_payload = make_payload()
+
+    revocation.consume(
+        revocation.jtis,
+        revocation.epochs,
+        [(b'5-0', {b'jti': jwt_payload['jti'].encode()})],
+    )
+
+    # Проверка результата
+    assert revocation.is_revoked(jwt_payload)
+    assert revocation.last_id == '5-0'
@@ -0,0 +1,101 @@
+import json
+import time
+import uuid
+
+import pytest
+from commands.blocklist import move_to_blocklist, read_legacy_tokens
+from core.settings import settings
+from fakeredis import FakeRedis
+from services.base_cache import BaseRedisPipeline, BaseRedisStorage
+from services.jwt import JWTService
+from services.revocation_filter import RevocationFilterService
+
+BUCKET = settings.BLOCKLIST_BUCKET_SECONDS
+
+
+def make_payload(exp: int) -> dict:
+    return {'jti': str(uuid.uuid4()), 'sub': str(uuid.uuid4()), 'iat': exp - 60, 'exp': exp}
+
+
+def test_put_to_blocklist_groups_tokens_by_expiry_bucket(
+        redis_client: FakeRedis,
+        jwt_service: JWTService,
+):
+    bucket = int(time.time()) // BUCKET + 1
+    same_hour = {str(uuid.uuid4()): bucket * BUCKET + offset for offset in (0, BUCKET - 1)}
+    next_hour = {str(uuid.uuid4()): (bucket + 1) * BUCKET}
+
+    pipeline = jwt_service.cache.pipeline()
+    jwt_service.put_to_blocklist(pipeline=pipeline, tokens={**same_hour, **next_hour})
+    pipeline.execute()
+
+    # Проверка результата: одно множество на час, живущее до конца своего часа
+    assert redis_client.smembers(f'blocklist:{bucket}') == {jti.encode() for jti in same_hour}
+    assert redis_client.smembers(f'blocklist:{bucket + 1}') == {jti.encode() for jti in next_hour}
+    assert redis_client.expiretime(f'blocklist:{bucket}') == (bucket + 1) * BUCKET
+
+
+@pytest.mark.parametrize('filter_is_ready', (False, True))
+def test_revocation_check_looks_up_token_bucket(
+        redis_client: FakeRedis,
+        jwt_service: JWTService,
+        revocation_filter: RevocationFilterService,
+
+        filter_is_ready: bool,
+):
+    exp = int(time.time()) + 3600
+    revoked, misplaced, active = make_payload(exp), make_payload(exp), make_payload(exp)
+    # Токен ищется только в множестве часа своего exp
+    jwt_service.block_tokens(tokens={revoked['jti']: exp, misplaced['jti']: exp + BUCKET})
+    revocation_filter.is_ready = filter_is_ready
+
+    # Проверка результата
+    assert jwt_service.get_revoked_tokens(jwt_payloads=[revoked, misplaced, active]) == [
+        True, False, False,
+    ]
+
+
+def test_ready_filter_skips_redis_for_tokens_it_never_saw(
+        jwt_service: JWTService,
+        revocation_filter: RevocationFilterService,
+        monkeypatch,
+):
+    revocation_filter.load()
+    revocation_filter.is_ready = True
+    lookups = []
+    monkeypatch.setattr(
+        BaseRedisPipeline,
+        'set_is_member',
+        lambda pipeline, key, member, **kwargs: lookups.append(member),
+    )
+
+    # Выполнение проверки
+    assert not jwt_service.is_token_revoked(jwt_payload=make_payload(int(time.time()) + 3600))
+
+    # Проверка результата
+    assert not lookups
+
+
+def test_migrate_moves_legacy_keys_to_blocklist_and_stream(
+        redis_client: FakeRedis,
+        cache: BaseRedisStorage,
+        jwt_service: JWTService,
+        revocation_filter: RevocationFilterService,
+):
+    revoked, counter = str(uuid.uuid4()), str(uuid.uuid4())
+    redis_client.set(revoked, json.dumps({'jti': revoked}), ex=3600)
+    # Счётчик лимитов под тем же шаблоном ключа не переносится
+    redis_client.set(counter, '1', ex=3600)
+
+    # Выполнение переноса
+    tokens = read_legacy_tokens(cache=cache, keys=[revoked.encode(), counter.encode()])
+    move_to_blocklist(cache=cache, jwt_service=jwt_service, tokens=tokens)
+
+    # Проверка результата
+    assert list(tokens) == [revoked]
+    assert not redis_client.exists(revoked)
+    assert redis_client.exists(counter)
+    payload = {'jti': revoked, 'sub': 'user', 'iat': 0, 'exp': tokens[revoked]}
+    assert jwt_service.is_token_revoked(jwt_payload=payload)
+    stream = redis_client.xrange(revocation_filter.stream)
+    assert [fields[b'jti'].decode() for _, fields in stream] == [revoked]
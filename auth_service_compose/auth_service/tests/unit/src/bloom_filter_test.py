@@ -0,0 +1,38 @@
+import uuid
+
+from utils.bloom_filter import BloomFilter
+
+
+def test_added_items_are_always_found():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [str(uuid.uuid4()) for _ in range(1000)]
+
+    for item in items:
+        bloom_filter.add(item)
+
+    # Проверка результата: ложноотрицательных ответов не бывает
+    assert all(item in bloom_filter for item in items)
+
+
+def test_false_positive_rate_is_close_to_error_rate():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    for _ in range(1000):
+        bloom_filter.add(str(uuid.uuid4()))
+
+    false_positives = sum(str(uuid.uuid4()) in bloom_filter for _ in range(10_000))
+
+    # Проверка результата
+    assert false_positives < 10_000 * 0.03
+
+
+def test_is_full_after_capacity_items():
+    bloom_filter = BloomFilter(capacity=10, error_rate=0.01)
+
+    for index in range(9):
+        bloom_filter.add(str(index))
+    assert not bloom_filter.is_full()
+
+    bloom_filter.add('9')
+
+    # Проверка результата
+    assert bloom_filter.is_full()
@@ -0,0 +1,113 @@
+import pytest
+from core.settings import settings
+from flask import Flask
+from services import login_guard
+from services.base_cache import BaseRedisStorage
+from services.login_guard import LoginGuardService, get_client_ip
+
+LOGIN = 'User'
+IP = '203.0.113.7'
+
+
+@pytest.fixture
+def guard(cache: BaseRedisStorage) -> LoginGuardService:
+    return LoginGuardService(cache=cache)
+
+
+def is_about(seconds: int, expected: int) -> bool:
+    # Секунда могла смениться между записью блокировки и проверкой
+    return expected - 1 <= seconds <= expected
+
+
+def fail(guard: LoginGuardService, times: int, login: str = LOGIN, ip: str = IP):
+    for _ in range(times):
+        guard.register_failure(login=login, ip=ip)
+
+
+def test_login_is_locked_after_threshold(guard: LoginGuardService):
+    fail(guard, times=settings.LOGIN_FAILURES_THRESHOLD - 1)
+    assert guard.get_retry_after(login=LOGIN, ip=IP) is None
+
+    fail(guard, times=1)
+
+    # Проверка результата: блокируется логин в любом регистре, с любого адреса
+    retry_after = guard.get_retry_after(login=LOGIN.lower(), ip='198.51.100.1')
+    assert is_about(retry_after, settings.LOGIN_LOCK_SECONDS)
+    assert guard.get_retry_after(login='other', ip='198.51.100.1') is None
+
+
+def test_lock_window_doubles_with_each_failure(guard: LoginGuardService, redis_client):
+    fail(guard, times=settings.LOGIN_FAILURES_THRESHOLD)
+    windows = [redis_client.ttl(f'login_lock:login:{LOGIN.lower()}')]
+    for _ in range(2):
+        fail(guard, times=1)
+        windows.append(redis_client.ttl(f'login_lock:login:{LOGIN.lower()}'))
+
+    # Проверка результата
+    lock = settings.LOGIN_LOCK_SECONDS
+    assert all(map(is_about, windows, (lock, lock * 2, lock * 4)))
+
+
+def test_lock_window_is_capped(guard: LoginGuardService, monkeypatch):
+    monkeypatch.setattr(settings, 'LOGIN_LOCK_MAX_SECONDS', settings.LOGIN_LOCK_SECONDS * 3)
+
+    fail(guard, times=settings.LOGIN_FAILURES_THRESHOLD + 5)
+
+    # Проверка результата
+    retry_after = guard.get_retry_after(login=LOGIN, ip=IP)
+    assert is_about(retry_after, settings.LOGIN_LOCK_MAX_SECONDS)
+
+
+def test_ip_is_locked_after_its_own_threshold(guard: LoginGuardService):
+    # Подбор разных логинов с одного адреса
+    for attempt in range(settings.LOGIN_IP_FAILURES_THRESHOLD):
+        fail(guard, times=1, login=f'user{attempt}')
+
+    # Проверка результата
+    assert is_about(guard.get_retry_after(login='new', ip=IP), settings.LOGIN_LOCK_SECONDS)
+    assert guard.get_retry_after(login='new', ip='198.51.100.1') is None
+
+
+def test_successful_login_resets_login_failures(guard: LoginGuardService, redis_client):
+    fail(guard, times=settings.LOGIN_FAILURES_THRESHOLD - 1)
+
+    guard.reset(login=LOGIN)
+    fail(guard, times=settings.LOGIN_FAILURES_THRESHOLD - 1)
+
+    # Проверка результата: счёт неудач начат заново, а счётчик адреса сохранён
+    assert guard.get_retry_after(login=LOGIN, ip=IP) is None
+    assert int(redis_client.get(f'login_failures:ip:{IP}')) == (
+        (settings.LOGIN_FAILURES_THRESHOLD - 1) * 2
+    )
+
+
+@pytest.fixture
+def trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, 'TRUSTED_PROXIES', ['10.0.0.0/24', 'localhost'])
+    login_guard.trusted_proxies.delete('networks')
+    yield
+    login_guard.trusted_proxies.delete('networks')
+
+
+@pytest.mark.parametrize(
+    'remote_addr, expected_ip',
+    (
+            # Сеть из настроек и имя хоста доверенные
+            ('10.0.0.5', '203.0.113.7'),
+            ('127.0.0.1', '203.0.113.7'),
+            # Сервис из services_network заголовком подменить адрес не может
+            ('10.0.1.5', '10.0.1.5'),
+    ),
+)
+def test_real_ip_is_trusted_only_from_proxies(
+        trusted_proxies,
+
+        remote_addr: str,
+        expected_ip: str,
+):
+    with Flask(__name__).test_request_context(
+        headers={'X-Real-IP': '203.0.113.7'},
+        environ_base={'REMOTE_ADDR': remote_addr},
+    ):
+        # Проверка результата
+        assert get_client_ip() == expected_ip
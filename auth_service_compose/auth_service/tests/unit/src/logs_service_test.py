@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+from models import models
+from services.logs_service import LogsService
+
+
+class RecordingLogsService(LogsService):
+    """Вместо Postgres запоминает пачки INSERT и одиночные записи."""
+
+    def __init__(self, **kwargs):
+        super().__init__(cache=None, db=None, db_model=models.Log, **kwargs)
+        self.batches: list[list[dict]] = []
+        self.created: list[dict] = []
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def bulk_create(self, rows: list[dict], **kwargs):
+        self.unblocked.wait()
+        self.batches.append(rows)
+
+    def create_log(self, **log_params):
+        self.created.append(log_params)
+
+
+def make_service(**kwargs) -> RecordingLogsService:
+    params = {'queue_size': 100, 'batch_size': 10, 'flush_seconds': 0.05, 'put_timeout': 0.01}
+    params.update(kwargs)
+    return RecordingLogsService(**params)
+
+
+@pytest.fixture
+def app() -> Flask:
+    return Flask(__name__)
+
+
+def test_logs_are_written_in_batches(app: Flask):
+    service = make_service(batch_size=10)
+    service.start(app=app)
+
+    for index in range(25):
+        service.save_log(index=index)
+    service.stop()
+
+    # Проверка результата: порядок сохранён, пачки не больше batch_size
+    rows = [row['index'] for batch in service.batches for row in batch]
+    assert rows == list(range(25))
+    assert all(len(batch) <= 10 for batch in service.batches)
+    assert len(service.batches) < 25
+    assert not service.created
+
+
+def test_partial_batch_is_flushed_after_flush_seconds(app: Flask):
+    service = make_service(batch_size=10, flush_seconds=0.05)
+    service.start(app=app)
+
+    service.save_log(index=0)
+    time.sleep(0.2)
+
+    # Проверка результата: неполная пачка не ждёт остановки
+    assert service.batches == [[{'index': 0}]]
+    service.stop()
+
+
+def test_full_queue_falls_back_to_sync_write(app: Flask):
+    service = make_service(queue_size=1, batch_size=1)
+    # Поток записи занят первой пачкой, очередь забита второй записью
+    service.unblocked.clear()
+    service.start(app=app)
+    service.save_log(index=0)
+    time.sleep(0.05)
+    service.save_log(index=1)
+
+    service.save_log(index=2)
+
+    # Проверка результата: запрос записал свою запись сам
+    assert service.created == [{'index': 2}]
+    service.unblocked.set()
+    service.stop()
+    assert [row['index'] for batch in service.batches for row in batch] == [0, 1]
+
+
+def test_stop_flushes_queue(app: Flask):
+    service = make_service(batch_size=100, flush_seconds=60)
+    service.start(app=app)
+
+    for index in range(5):
+        service.save_log(index=index)
+    service.stop()
+
+    # Проверка результата: накопленное дописано, поток остановлен
+    assert [row['index'] for batch in service.batches for row in batch] == list(range(5))
+    assert service.writer is None
+
+
+def test_save_log_writes_synchronously_without_writer():
+    service = make_service()
+
+    service.save_log(index=0)
+
+    # Проверка результата
+    assert service.created == [{'index': 0}]
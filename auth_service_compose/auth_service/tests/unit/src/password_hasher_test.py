@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+import pytest
+from models import models
+from services.user import UserService
+from utils.password_hasher import (INLINE_EXECUTOR, Argon2Scheme,
+                                   PasswordHasher, PasswordScheme,
+                                   PBKDF2Scheme, ScryptScheme)
+
+PASSWORD = 'hirnim-fogkuj-pUrhi4'
+
+# Минимальная стоимость: проверяется формат, а не стойкость
+SCHEMES = (
+    PBKDF2Scheme(iterations=1000),
+    ScryptScheme(n=2 ** 4, r=8, p=1),
+    Argon2Scheme(time_cost=1, memory_cost=1024, parallelism=1),
+)
+
+
+@pytest.mark.parametrize('scheme', SCHEMES, ids=lambda scheme: scheme.name)
+def test_scheme_verifies_only_its_password(scheme: PasswordScheme):
+    password_hash = scheme.hash(PASSWORD)
+
+    # Проверка результата
+    assert scheme.identify(password_hash)
+    assert scheme.verify(password_hash, PASSWORD)
+    assert not scheme.verify(password_hash, f'{PASSWORD}!')
+    # Соль у каждого хеша своя
+    assert scheme.hash(PASSWORD) != password_hash
+
+
+@pytest.mark.parametrize('scheme', SCHEMES, ids=lambda scheme: scheme.name)
+def test_scheme_needs_rehash_when_cost_changes(scheme: PasswordScheme):
+    password_hash = scheme.hash(PASSWORD)
+
+    # Проверка результата
+    assert not scheme.needs_rehash(password_hash)
+    assert scheme.with_cost(scheme.cost * 2).needs_rehash(password_hash)
+
+
+@pytest.mark.parametrize('old_scheme', SCHEMES, ids=lambda scheme: scheme.name)
+@pytest.mark.parametrize('new_scheme', SCHEMES, ids=lambda scheme: scheme.name)
+def test_hasher_verifies_hashes_of_any_scheme(
+        old_scheme: PasswordScheme,
+        new_scheme: PasswordScheme,
+):
+    hasher = PasswordHasher(scheme=new_scheme, executor=INLINE_EXECUTOR, workers=1)
+    hasher.schemes[old_scheme.name] = old_scheme
+    password_hash = old_scheme.hash(PASSWORD)
+
+    # Проверка результата: хеш проверяется своей схемой, а обновляется под текущую
+    assert hasher.verify(password_hash, PASSWORD)
+    assert hasher.needs_rehash(password_hash) == (old_scheme is not new_scheme)
+
+
+def test_hasher_runs_in_thread_pool():
+    hasher = PasswordHasher(scheme=SCHEMES[0], executor='thread', workers=2)
+
+    # Проверка результата
+    assert hasher.verify(hasher.hash(PASSWORD), PASSWORD)
+
+
+@pytest.fixture
+def current_scheme(monkeypatch):
+    def use(scheme: PasswordScheme):
+        hasher = PasswordHasher(scheme=scheme, executor=INLINE_EXECUTOR, workers=1)
+        for known_scheme in SCHEMES:
+            hasher.schemes.setdefault(known_scheme.name, known_scheme)
+        hasher.schemes[scheme.name] = scheme
+        monkeypatch.setattr(models, 'get_password_hasher', lambda: hasher)
+
+    return use
+
+
+@pytest.fixture
+def user_service(cache) -> UserService:
+    db = SimpleNamespace(commits=0)
+
+    def commit():
+        db.commits += 1
+
+    db.commit = commit
+    return UserService(cache=cache, db=db, db_model=models.User)
+
+
+def test_check_password_rehashes_with_current_scheme(
+        current_scheme,
+        user_service: UserService,
+):
+    current_scheme(SCHEMES[0])
+    user = models.User(login='user', email='user@example.com')
+    user.set_password(PASSWORD)
+    old_hash = user.password
+
+    current_scheme(SCHEMES[1])
+
+    # Проверка результата: при входе хеш переписан по текущей политике
+    assert user_service.check_password(user=user, password=PASSWORD)
+    assert SCHEMES[1].identify(user.password)
+    assert user.password != old_hash
+    assert user_service.db.commits == 1
+    assert user_service.check_password(user=user, password=PASSWORD)
+    assert user_service.db.commits == 1
+
+
+def test_check_password_keeps_hash_on_wrong_password(
+        current_scheme,
+        user_service: UserService,
+):
+    current_scheme(SCHEMES[0])
+    user = models.User(login='user', email='user@example.com')
+    user.set_password(PASSWORD)
+    old_hash = user.password
+
+    current_scheme(SCHEMES[1])
+
+    # Проверка результата
+    assert not user_service.check_password(user=user, password=f'{PASSWORD}!')
+    assert user.password == old_hash
+    assert not user_service.db.commits
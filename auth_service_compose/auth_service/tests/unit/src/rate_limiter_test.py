@@ -0,0 +1,135 @@
+import time
+from typing import Optional
+
+import pytest
+from core.rate_limits import API_V1, RATE_LIMIT_POLICIES, STAFF
+from core.settings import settings
+from extensions.rate_limiter import (GCRA, LIMIT_PERIOD_IN_SECONDS,
+                                     GCRARateLimiter, HybridRateLimiter,
+                                     RateLimitPolicies)
+from fakeredis import FakeRedis
+from services.base_cache import BaseRedisStorage
+
+
+def rewind(redis_client: FakeRedis, key: str, seconds: float):
+    # Сдвиг TAT назад - то же, что ожидание: время скрипт берёт у Redis
+    tat = float(redis_client.get(f'{GCRARateLimiter.key_prefix}:{key}'))
+    redis_client.set(f'{GCRARateLimiter.key_prefix}:{key}', tat - seconds * 1000, px=60_000)
+
+
+def test_gcra_allows_limit_then_denies(cache: BaseRedisStorage):
+    limiter = GCRARateLimiter(cache=cache, limit=10)
+
+    results = [limiter.hit(key='client') for _ in range(11)]
+
+    # Проверка результата
+    assert [result.allowed for result in results] == [True] * 10 + [False]
+    assert [result.remaining for result in results[:10]] == list(range(9, -1, -1))
+    # Следующий токен появится через интервал 60 / 10 секунд
+    assert results[-1].retry_after == LIMIT_PERIOD_IN_SECONDS // 10
+
+
+def test_gcra_keys_are_independent(cache: BaseRedisStorage):
+    limiter = GCRARateLimiter(cache=cache, limit=1)
+
+    # Проверка результата
+    assert limiter.hit(key='first').allowed
+    assert not limiter.hit(key='first').allowed
+    assert limiter.hit(key='second').allowed
+
+
+def test_gcra_has_no_burst_on_window_boundary(redis_client: FakeRedis, cache: BaseRedisStorage):
+    limiter = GCRARateLimiter(cache=cache, limit=10)
+    for _ in range(10):
+        limiter.hit(key='client')
+
+    # Через половину периода восстановилась половина лимита, а не весь, как у
+    # счётчика в окне: двойного лимита на стыке окон не бывает
+    rewind(redis_client=redis_client, key='client', seconds=LIMIT_PERIOD_IN_SECONDS / 2)
+    allowed = sum(limiter.hit(key='client').allowed for _ in range(10))
+
+    # Проверка результата
+    assert allowed == 5
+
+
+def test_gcra_reservation_grants_at_most_available(cache: BaseRedisStorage):
+    limiter = GCRARateLimiter(cache=cache, limit=10)
+
+    # Проверка результата: [выдано, осталось, через сколько мс следующий]
+    assert limiter.reserve(key='client', requested=7) == [7, 3, 0]
+    assert limiter.reserve(key='client', requested=7) == [3, 0, 0]
+    granted, remaining, retry_after_ms = limiter.reserve(key='client', requested=7)
+    assert (granted, remaining) == (0, 0)
+    assert 0 < retry_after_ms <= LIMIT_PERIOD_IN_SECONDS * 1000 / 10
+
+def test_hybrid_sparse_client_gets_whole_limit(cache: BaseRedisStorage):
+    limiter = HybridRateLimiter(cache=cache, limit=10, chunk=5, sync_seconds=0.01, maxsize=100)
+
+    # Каждый запрос приходит уже после устаревания пачки предыдущего
+    allowed = []
+    for _ in range(12):
+        allowed.append(limiter.hit(key='sparse').allowed)
+        time.sleep(0.02)
+
+    # Проверка результата: неизрасходованные токены вернулись, лишних не выдано
+    assert allowed == [True] * 10 + [False] * 2
+
+
+def test_hybrid_workers_share_limit(cache: BaseRedisStorage):
+    workers = [
+        HybridRateLimiter(cache=cache, limit=10, chunk=4, sync_seconds=60, maxsize=100)
+        for _ in range(3)
+    ]
+
+    allowed = sum(worker.hit(key='busy').allowed for _ in range(10) for worker in workers)
+
+    # Проверка результата: пачки делят лимит между воркерами, не превышая его
+    assert allowed == 10
+
+
+@pytest.fixture
+def policies(cache: BaseRedisStorage) -> RateLimitPolicies:
+    return RateLimitPolicies(policies=RATE_LIMIT_POLICIES, cache=cache, limiter_name=GCRA)
+
+
+@pytest.mark.parametrize(
+    'rule, method, role, expected_name, expected_limit',
+    (
+            # Правило и метод
+            (f'{API_V1}/login', 'POST', 0, 'login', 10),
+            # Для другого метода того же правила - общая политика
+            (f'{API_V1}/login', 'GET', 0, 'default', settings.REQUEST_LIMIT_PER_MINUTE),
+            # Правило для любого метода
+            (f'{API_V1}/refresh', 'POST', 0, 'refresh', settings.REQUEST_LIMIT_PER_MINUTE * 3),
+            # Общая политика
+            (f'{API_V1}/roles', 'GET', 0, 'default', settings.REQUEST_LIMIT_PER_MINUTE),
+            # Персоналу - политика с наибольшим min_role, не превышающим роль
+            (f'{API_V1}/roles', 'GET', STAFF, 'staff', settings.REQUEST_LIMIT_PER_MINUTE * 10),
+            (f'{API_V1}/users/<user_id>/password', 'PUT', STAFF - 1, 'password', 5),
+            (f'{API_V1}/users/<user_id>/password', 'PUT', STAFF, 'password', None),
+            # Политика правила важнее общей политики персонала
+            (f'{API_V1}/login', 'POST', STAFF, 'login', 10),
+    ),
+)
+def test_resolve_policy(
+        policies: RateLimitPolicies,
+
+        rule: str,
+        method: str,
+        role: int,
+        expected_name: str,
+        expected_limit: Optional[int],
+):
+    policy = policies.resolve(rule=rule, method=method, role=role)
+
+    # Проверка результата
+    assert (policy.name, policy.limit) == (expected_name, expected_limit)
+    assert (policy.limiter is None) == (expected_limit is None)
+
+
+def test_policies_with_same_name_share_limiter(policies: RateLimitPolicies):
+    api_login = policies.resolve(rule=f'{API_V1}/login', method='POST', role=0)
+    form_login = policies.resolve(rule='/login', method='POST', role=0)
+
+    # Проверка результата: вход через API и через форму считается одним счётчиком
+    assert api_login.limiter is form_login.limiter
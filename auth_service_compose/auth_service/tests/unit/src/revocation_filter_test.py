@@ -0,0 +1,104 @@
+import json
+import time
+import uuid
+
+from core.settings import settings
+from services.base_cache import BaseRedisStorage
+from services.jwt import JWTService
+from services.revocation_filter import RevocationFilterService
+
+
+def test_everything_might_be_revoked_until_ready(revocation_filter: RevocationFilterService):
+    # Проверка результата: до загрузки фильтр не может сказать «точно не отозван»
+    assert revocation_filter.might_be_revoked(str(uuid.uuid4()))
+
+
+def test_consumed_jti_might_be_revoked_when_ready(revocation_filter: RevocationFilterService):
+    revoked, other = str(uuid.uuid4()), str(uuid.uuid4())
+    revocation_filter.load()
+    revocation_filter.is_ready = True
+
+    revocation_filter.consume(
+        bloom_filter=revocation_filter.bloom_filter,
+        epochs=revocation_filter.epochs,
+        entries=[
+            (b'1-0', {b'jti': revoked.encode()}),
+            (b'2-0', {b'user_id': b'user', b'epoch': b'100'}),
+            (b'3-0', {b'user_id': b'user', b'epoch': b'50'}),
+        ],
+    )
+
+    # Проверка результата
+    assert revocation_filter.might_be_revoked(revoked)
+    assert not revocation_filter.might_be_revoked(other)
+    assert revocation_filter.epochs == {'user': 100}
+    assert revocation_filter.last_id == '3-0'
+
+
+def test_load_reads_published_jtis(
+        cache: BaseRedisStorage,
+        revocation_filter: RevocationFilterService,
+):
+    revoked = str(uuid.uuid4())
+    pipeline = cache.pipeline()
+    revocation_filter.publish(jtis=[revoked], pipeline=pipeline)
+    pipeline.execute()
+
+    # Новый воркер собирает фильтр из потока
+    worker_filter = RevocationFilterService(cache=cache, capacity=100, error_rate=0.001)
+    worker_filter.load()
+    worker_filter.is_ready = True
+
+    # Проверка результата
+    assert worker_filter.might_be_revoked(revoked)
+
+
+def test_load_reads_blocklist_revoked_before_stream(
+        cache: BaseRedisStorage,
+        jwt_service: JWTService,
+        revocation_filter: RevocationFilterService,
+):
+    # Токен отозван до появления потока: он есть только в множестве списка
+    revoked = str(uuid.uuid4())
+    pipeline = cache.pipeline()
+    jwt_service.put_to_blocklist(pipeline=pipeline, tokens={revoked: int(time.time()) + 3600})
+    pipeline.execute()
+
+    revocation_filter.load()
+    revocation_filter.is_ready = True
+
+    # Проверка результата
+    assert revocation_filter.might_be_revoked(revoked)
+
+
+def test_load_reads_legacy_keys_while_they_are_checked(
+        cache: BaseRedisStorage,
+        revocation_filter: RevocationFilterService,
+        monkeypatch,
+):
+    monkeypatch.setattr(settings, 'BLOCKLIST_CHECK_LEGACY', True)
+    revoked, counter = str(uuid.uuid4()), str(uuid.uuid4())
+    cache.set(key=revoked, cache_value=json.dumps({'jti': revoked}), expire=3600)
+    # Счётчик лимитов под тем же шаблоном ключа отозванным токеном не считается
+    cache.set(key=counter, cache_value='1', expire=3600)
+
+    revocation_filter.load()
+    revocation_filter.is_ready = True
+
+    # Проверка результата
+    assert revocation_filter.might_be_revoked(revoked)
+    assert not revocation_filter.might_be_revoked(counter)
+
+
+def test_load_grows_full_filter(cache: BaseRedisStorage):
+    revocation_filter = RevocationFilterService(cache=cache, capacity=2, error_rate=0.001)
+    jtis = [str(uuid.uuid4()) for _ in range(5)]
+    pipeline = cache.pipeline()
+    revocation_filter.publish(jtis=jtis, pipeline=pipeline)
+    pipeline.execute()
+
+    revocation_filter.load()
+
+    # Проверка результата
+    assert not revocation_filter.bloom_filter.is_full()
+    assert all(jti in revocation_filter.bloom_filter for jti in jtis)
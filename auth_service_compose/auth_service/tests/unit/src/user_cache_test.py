@@ -0,0 +1,137 @@
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+from models import models
+from services.base_cache import BaseRedisStorage
+from services.claims import CacheClaims, ClaimsService
+from services.user import UserService
+from utils import utils
+from utils.ttl_cache import TTLCache
+
+
+def test_ttl_cache_expires_items():
+    ttl_cache = TTLCache(maxsize=10, ttl=0.01)
+    ttl_cache.set('key', 'value')
+    assert ttl_cache.get('key') == 'value'
+
+    time.sleep(0.02)
+
+    # Проверка результата: устаревшая запись удаляется при чтении
+    assert ttl_cache.get('key') is None
+    assert not len(ttl_cache)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    ttl_cache = TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set('first', 1)
+    ttl_cache.set('second', 2)
+    ttl_cache.get('first')
+
+    ttl_cache.set('third', 3)
+
+    # Проверка результата
+    assert ttl_cache.get('second') is None
+    assert (ttl_cache.get('first'), ttl_cache.get('third')) == (1, 3)
+
+
+@pytest.fixture
+def user_db() -> SimpleNamespace:
+    user_id = uuid.uuid4()
+    return SimpleNamespace(to_dict=lambda: {
+        'id': user_id,
+        'login': 'user',
+        'email': 'user@example.com',
+        'permissions': {},
+    })
+
+
+@pytest.fixture
+def user_service(cache: BaseRedisStorage, user_db: SimpleNamespace, monkeypatch) -> UserService:
+    service = UserService(cache=cache, db=None, db_model=models.User)
+    service.db_queries = []
+
+    def get(item_id: str, **kwargs):
+        service.db_queries.append(item_id)
+        return user_db
+
+    monkeypatch.setattr(service, 'get', get)
+    return service
+
+
+def test_get_current_user_goes_to_postgres_once(
+        user_service: UserService,
+        user_db: SimpleNamespace,
+):
+    user_id = str(user_db.to_dict()['id'])
+
+    users = [user_service.get_current_user(user_id=user_id) for _ in range(3)]
+
+    # Проверка результата
+    assert all(str(user.id) == user_id for user in users)
+    assert user_service.db_queries == [user_id]
+
+
+def test_get_current_user_reads_redis_after_local_miss(
+        user_service: UserService,
+        user_db: SimpleNamespace,
+):
+    user_id = str(user_db.to_dict()['id'])
+    user_service.get_current_user(user_id=user_id)
+
+    # Другой воркер: своей памяти нет, но запись уже в Redis
+    user_service.local_cache.delete(user_id)
+    user = user_service.get_current_user(user_id=user_id)
+
+    # Проверка результата
+    assert str(user.id) == user_id
+    assert user_service.db_queries == [user_id]
+
+
+def test_invalidate_user_drops_both_cache_levels(
+        user_service: UserService,
+        user_db: SimpleNamespace,
+):
+    user_id = str(user_db.to_dict()['id'])
+    user_service.get_current_user(user_id=user_id)
+
+    user_service.invalidate_user(user_id=user_id)
+    user_service.get_current_user(user_id=user_id)
+
+    # Проверка результата
+    assert user_service.db_queries == [user_id, user_id]
+
+
+@pytest.mark.parametrize(
+    'role, expected_status',
+    (
+            (5, 200),
+            (4, 403),
+    ),
+)
+def test_required_role_level_uses_current_role(
+        cache: BaseRedisStorage,
+        monkeypatch,
+
+        role: int,
+        expected_status: int,
+):
+    # В токене роль старшая, но в Postgres у пользователя уже другая
+    claims_service = ClaimsService(cache=cache, db=None, db_model=models.User)
+    monkeypatch.setattr(
+        claims_service,
+        'load_claims',
+        lambda user_id: CacheClaims(role=role, permissions={}),
+    )
+    monkeypatch.setattr(utils, 'get_claims_service', lambda: claims_service)
+    monkeypatch.setattr(utils, 'get_jwt', lambda: {'sub': 'user', 'role': 10})
+    view = utils.required_role_level(5)(lambda: ('ok', 200))
+
+    with Flask(__name__).test_request_context():
+        response = view()
+
+    # Проверка результата
+    status = response[1] if isinstance(response, tuple) else response.status_code
+    assert status == expected_status